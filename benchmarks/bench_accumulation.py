@@ -0,0 +1,67 @@
+"""
+Benchmark the page accumulation strategies used by ``fetch_trials``.
+
+Compares the previous per-page ``_merge_trials`` path with the linear
+``_TrialAccumulator`` on synthetic studies. Run from the repository root:
+
+    python -m benchmarks.bench_accumulation --sizes 1000 10000 100000
+"""
+
+import argparse
+import json
+import time
+
+from pyctrials import ClinicalTrialsAPI
+from pyctrials.pyctrials import _TrialAccumulator
+from tests.helpers import make_pages
+
+
+def merge_path(client, pages):
+    """Accumulate pages with the old outer-merge approach."""
+    all_trials = None
+    for text in pages:
+        current = client._process_response(text)
+        if all_trials is None:
+            all_trials = current
+        else:
+            all_trials = client._merge_trials(all_trials, current)
+    return all_trials
+
+
+def accumulator_path(client, pages):
+    """Accumulate pages with the linear-time accumulator."""
+    accumulator = _TrialAccumulator()
+    for text in pages:
+        accumulator.add(client._flatten_response(text))
+    return accumulator.to_frame()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--page-size', type=int, default=100)
+    parser.add_argument('--skip-merge-above', type=int, default=None,
+                        help='skip the slow merge path above this many studies')
+    args = parser.parse_args()
+    
+    client = ClinicalTrialsAPI()
+    print(f"{'studies':>10} {'merge (s)':>12} {'accumulate (s)':>16} {'speedup':>10}")
+    for size in args.sizes:
+        pages = [json.dumps(page) for page in make_pages(size, args.page_size)]
+        
+        start = time.perf_counter()
+        accumulator_path(client, pages)
+        new_time = time.perf_counter() - start
+        
+        if args.skip_merge_above is not None and size > args.skip_merge_above:
+            print(f"{size:>10} {'skipped':>12} {new_time:>16.3f} {'-':>10}")
+            continue
+        
+        start = time.perf_counter()
+        merge_path(client, pages)
+        old_time = time.perf_counter() - start
+        print(f"{size:>10} {old_time:>12.3f} {new_time:>16.3f} {old_time / new_time:>9.1f}x")
+
+
+if __name__ == '__main__':
+    main()
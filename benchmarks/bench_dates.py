@@ -0,0 +1,44 @@
+"""
+Benchmark the normalization of partial start/completion dates.
+
+Compares pd.to_datetime with format inference on the raw date strings
+against normalize_dates, which parses each distinct string once with
+explicit formats. Run from the repository root:
+
+    python -m benchmarks.bench_dates --studies 1000000
+"""
+
+import argparse
+import time
+
+import pandas as pd
+
+from pyctrials.columnar import normalize_dates
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--studies', type=int, default=200000)
+    args = parser.parse_args()
+    
+    # Mix of day- and month-precision dates, as returned by the API
+    dates = [
+        f'20{i % 25:02d}-{1 + i % 12:02d}' if i % 3 else f'20{i % 25:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}'
+        for i in range(args.studies)
+    ]
+    
+    start = time.perf_counter()
+    inferred = pd.to_datetime(pd.Series(dates, dtype=object), errors='coerce')
+    inferred_time = time.perf_counter() - start
+    
+    start = time.perf_counter()
+    normalized, precision = normalize_dates(dates)
+    normalized_time = time.perf_counter() - start
+    
+    print(f"to_datetime (inferred): {inferred_time:.3f}s, {int(inferred.isna().sum())} dates lost")
+    print(f"normalize_dates:        {normalized_time:.3f}s, {int(pd.isna(normalized).sum())} dates lost")
+    print(pd.Series(precision).value_counts().to_string())
+
+
+if __name__ == '__main__':
+    main()
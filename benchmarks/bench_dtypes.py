@@ -0,0 +1,43 @@
+"""
+Benchmark the memory footprint of default and compact trial frames.
+
+Builds the same synthetic studies with the default dtypes and with
+compact=True, and reports the deep memory usage of every column. Run
+from the repository root:
+
+    python -m benchmarks.bench_dtypes --studies 400000
+"""
+
+import argparse
+
+from pyctrials import ClinicalTrialParser
+from pyctrials.columnar import ColumnBuilder
+from tests.helpers import make_study
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--studies', type=int, default=100000)
+    args = parser.parse_args()
+    
+    trial_parser = ClinicalTrialParser()
+    builder = ColumnBuilder(trial_parser.schema())
+    builder.extend(trial_parser.flatten(make_study(i)) for i in range(args.studies))
+    
+    default = builder.to_frame().memory_usage(deep=True, index=False)
+    compact_frame = builder.to_frame(compact=True)
+    compact = compact_frame.memory_usage(deep=True, index=False)
+    
+    mib = 1024 ** 2
+    print(f"{'column':<20} {'dtype':<16} {'default MiB':>12} {'compact MiB':>12} {'saved':>7}")
+    for column in default.index:
+        saved = 1 - compact[column] / default[column] if default[column] else 0
+        print(f"{column:<20} {str(compact_frame[column].dtype):<16} "
+              f"{default[column] / mib:>12.2f} {compact[column] / mib:>12.2f} {saved:>6.0%}")
+    total_saved = 1 - compact.sum() / default.sum()
+    print(f"{'total':<20} {'':<16} {default.sum() / mib:>12.2f} "
+          f"{compact.sum() / mib:>12.2f} {total_saved:>6.0%}")
+
+
+if __name__ == '__main__':
+    main()
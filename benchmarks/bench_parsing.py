@@ -0,0 +1,57 @@
+"""
+Benchmark process-pool flattening of studies.
+
+Flattens synthetic studies in-process and with increasing numbers of
+worker processes. Raw JSON is handed to the workers, as in the bulk
+archive path, so decoding is parallelized too. Run from the repository
+root:
+
+    python -m benchmarks.bench_parsing --studies 100000 --workers 1 2 4 8
+"""
+
+import argparse
+import json
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from pyctrials import ClinicalTrialParser
+from pyctrials.parallel import DEFAULT_CHUNK_SIZE, iter_flattened_chunks
+from tests.helpers import make_study
+
+
+def run(parser, studies, workers, chunk_size):
+    """Flatten all studies and return the elapsed time in seconds."""
+    start = time.perf_counter()
+    if workers <= 1:
+        rows = sum(len(c['nct_id']) for c in iter_flattened_chunks(parser, studies))
+    else:
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            chunks = iter_flattened_chunks(parser, studies, executor, chunk_size)
+            rows = sum(len(c['nct_id']) for c in chunks)
+    assert rows == len(studies)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--studies', type=int, default=100000)
+    parser.add_argument('--workers', type=int, nargs='+',
+                        default=sorted({1, 2, 4, os.cpu_count() or 1}))
+    parser.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args()
+    
+    studies = [json.dumps(make_study(i)).encode() for i in range(args.studies)]
+    trial_parser = ClinicalTrialParser()
+    
+    baseline = None
+    print(f"{'workers':>8} {'time (s)':>10} {'studies/s':>12} {'speedup':>9}")
+    for workers in args.workers:
+        elapsed = run(trial_parser, studies, workers, args.chunk_size)
+        baseline = baseline or elapsed
+        print(f"{workers:>8} {elapsed:>10.3f} {args.studies / elapsed:>12.0f} "
+              f"{baseline / elapsed:>8.2f}x")
+
+
+if __name__ == '__main__':
+    main()
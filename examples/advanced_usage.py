@@ -2,22 +2,23 @@
 Advanced usage examples for the Clinical Trials API client.
 """
 
-from pyctrials import ClinicalTrialsAPI
+from pyctrials import ClinicalTrialsAPI, explode_column
 import pandas as pd
 from datetime import datetime, timedelta
 
 def analyze_trial_timeline():
     """Analyze trial timelines and duration."""
-    client = ClinicalTrialsAPI()
+    client = ClinicalTrialsAPI(list_columns=True)
     
-    # Fetch trials
+    # Fetch trials, keeping phases and keywords as lists
     trials = client.fetch_trials("Parkinson Disease")
     
-    # Convert dates and calculate duration
-    trials['duration'] = (
-        pd.to_datetime(trials['completion_date']) - 
-        pd.to_datetime(trials['start_date'])
+    # Dates are already datetime64; only compare dates known to the day
+    exact = (
+        (trials['start_date_precision'] == 'day') &
+        (trials['completion_date_precision'] == 'day')
     )
+    trials['duration'] = (trials['completion_date'] - trials['start_date']).where(exact)
     
     # Analyze duration statistics
     print("Trial Duration Statistics (in days):")
@@ -32,7 +33,7 @@ def sponsor_analysis(trials):
     sponsor_stats = trials.groupby('sponsor').agg({
         'nct_id': 'count',
         'enrollment_count': 'mean',
-        'phase': lambda x: x.value_counts().index[0] if len(x) > 0 else None
+        'phase': lambda x: x.str.join(', ').value_counts().index[0] if len(x) > 0 else None
     }).rename(columns={
         'nct_id': 'trial_count',
         'enrollment_count': 'avg_enrollment',
@@ -46,12 +47,11 @@ def sponsor_analysis(trials):
 
 def keyword_analysis(trials):
     """Analyze common keywords and their relationships."""
-    # Split keywords into individual terms
-    keywords = trials['keywords'].str.split(',').explode()
+    # One row per (trial, keyword)
+    keywords = explode_column(trials, 'keywords')
     
-    # Clean and count keywords
-    keywords = keywords.str.strip()
-    keyword_counts = keywords.value_counts()
+    # Count keywords
+    keyword_counts = keywords['keywords'].value_counts()
     
     print("\nMost Common Keywords:")
     print(keyword_counts.head(10))
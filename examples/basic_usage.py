@@ -2,7 +2,8 @@
 Basic usage examples for the Clinical Trials API client.
 """
 
-from pyctrials import ClinicalTrialsAPI
+from pyctrials import ClinicalTrialsAPI, AsyncClinicalTrialsAPI
+import asyncio
 import pandas as pd
 import matplotlib.pyplot as plt
 
@@ -10,17 +11,17 @@ def basic_search():
     """Basic search for clinical trials."""
     client = ClinicalTrialsAPI()
     
-    # Fetch trials for a specific condition
-    trials = client.fetch_trials("Pompe Disease")
+    # Fetch trials for a specific condition, with one row per trial site
+    trials, sites = client.fetch_trials("Pompe Disease", sites=True)
     
     # Display basic statistics
     print(f"Total trials found: {len(trials)}")
     print("\nTrials by phase:")
     print(trials['phase'].value_counts())
     
-    return trials
+    return trials, sites
 
-def analyze_trials(trials):
+def analyze_trials(trials, sites):
     """Analyze trial data and create visualizations."""
     # Create phase distribution plot
     phase_dist = trials['phase'].value_counts()
@@ -38,18 +39,22 @@ def analyze_trials(trials):
     
     # Look at trial locations
     print("\nTop 10 countries with most trials:")
-    countries = trials['locations'].str.split(',').explode()
-    print(countries.value_counts().head(10))
+    trials_per_country = sites.groupby('country', observed=True)['nct_id'].nunique()
+    print(trials_per_country.sort_values(ascending=False).head(10))
 
 def compare_conditions():
     """Compare trials for different conditions."""
-    client = ClinicalTrialsAPI()
     conditions = ["Pompe Disease", "Fabry Disease", "Gaucher Disease"]
     
-    results = {}
-    for condition in conditions:
-        trials = client.fetch_trials(condition)
-        results[condition] = len(trials)
+    # Fetch all conditions concurrently over one connection pool
+    async def fetch_all():
+        async with AsyncClinicalTrialsAPI(max_concurrency=4) as client:
+            return await client.gather_trials(conditions)
+    
+    results = {
+        condition: len(trials)
+        for condition, trials in asyncio.run(fetch_all()).items()
+    }
     
     # Create comparison plot
     plt.figure(figsize=(10, 6))
@@ -61,10 +66,10 @@ def compare_conditions():
 
 if __name__ == "__main__":
     # Run basic search example
-    trials = basic_search()
+    trials, sites = basic_search()
     
     # Analyze the results
-    analyze_trials(trials)
+    analyze_trials(trials, sites)
     
     # Compare different conditions
     compare_conditions()
\ No newline at end of file
@@ -4,7 +4,36 @@ ClinicalTrials.gov API Client
 A Python client for interacting with the ClinicalTrials.gov API v2.
 """
 
+import logging
+
 from .pyctrials import ClinicalTrialsAPI, ClinicalTrialParser
+from .aio import AsyncClinicalTrialsAPI
+from .cache import ResponseCache
+from .retry import RetryPolicy
+from .ratelimit import FileRateLimiter, RateLimiter
+from .circuit import CircuitBreaker, CircuitOpenError
+from .metrics import MetricsRegistry
+from .store import TrialStore
+from .bulk import load_bulk_archive
+from .columnar import child_tables, explode_column
+
+# Library logging stays silent unless the application configures handlers
+logging.getLogger(__name__).addHandler(logging.NullHandler())
 
 __version__ = "0.1.11"
-__all__ = ["ClinicalTrialsAPI", "ClinicalTrialParser"]
\ No newline at end of file
+__all__ = [
+    "ClinicalTrialsAPI",
+    "ClinicalTrialParser",
+    "AsyncClinicalTrialsAPI",
+    "ResponseCache",
+    "RetryPolicy",
+    "RateLimiter",
+    "FileRateLimiter",
+    "CircuitBreaker",
+    "CircuitOpenError",
+    "MetricsRegistry",
+    "TrialStore",
+    "load_bulk_archive",
+    "child_tables",
+    "explode_column",
+]
\ No newline at end of file
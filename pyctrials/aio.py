@@ -0,0 +1,173 @@
+"""
+Asyncio client for the ClinicalTrials.gov API.
+
+Runs the blocking page requests of ClinicalTrialsAPI on a bounded thread
+pool, so many queries can be fetched concurrently over one shared
+connection pool while reusing the same retry logic and parser.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncIterator, Dict, Iterable, Optional, Union
+
+import pandas as pd
+
+from .pyctrials import ClinicalTrialsAPI, _TrialAccumulator
+
+
+class AsyncClinicalTrialsAPI:
+    """Asyncio counterpart of ClinicalTrialsAPI with bounded concurrency."""
+    
+    def __init__(self,
+                 max_concurrency: int = 8,
+                 client: Optional[ClinicalTrialsAPI] = None,
+                 **client_kwargs):
+        """
+        Initialize the asyncio client.
+        
+        Args:
+            max_concurrency (int): Maximum number of requests in flight
+            client (Optional[ClinicalTrialsAPI]): Synchronous client whose
+                session, retry settings and parser are shared
+            **client_kwargs: Arguments for a new ClinicalTrialsAPI when no
+                client is given; the pool size defaults to max_concurrency
+        """
+        if client is None:
+            client_kwargs.setdefault('pool_maxsize', max_concurrency)
+            client = ClinicalTrialsAPI(**client_kwargs)
+        self.client = client
+        self.parser = client.parser
+        self.max_concurrency = max_concurrency
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_concurrency,
+            thread_name_prefix='pyctrials'
+        )
+    
+    async def __aenter__(self) -> 'AsyncClinicalTrialsAPI':
+        return self
+    
+    async def __aexit__(self, *exc_info) -> None:
+        self.close()
+    
+    def close(self) -> None:
+        """Shut down the worker threads and close the shared session."""
+        self._executor.shutdown(wait=False)
+        self.client.close()
+    
+    async def _run(self, func, *args):
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+    
+    async def get_version(self) -> Dict:
+        """
+        Get the API version information.
+        
+        Returns:
+            Dict: API version details
+        """
+        return await self._run(self.client.get_version)
+    
+    async def iter_pages(self,
+                         condition: str,
+                         status: str = 'RECRUITING',
+                         page_size: Union[int, str] = 10,
+                         max_results: Optional[int] = None,
+                         fields: Optional[Union[str, Iterable[str]]] = None,
+                         advanced_filter: Optional[str] = None) -> AsyncIterator[pd.DataFrame]:
+        """
+        Iterate over the pages of a query as they are downloaded.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            max_results (Optional[int]): Stop after this many trials per query
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            
+        Yields:
+            pd.DataFrame: Trials of one page
+        """
+        pager = self.client._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter
+        )
+        while not pager.done:
+            records = await self._run(self.client._fetch_page, pager)
+            yield self.client._records_to_frame(records)
+    
+    async def fetch_trials(self,
+                           condition: str,
+                           status: str = 'RECRUITING',
+                           page_size: Union[int, str] = 10,
+                           max_results: Optional[int] = None,
+                           fields: Optional[Union[str, Iterable[str]]] = None,
+                           advanced_filter: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch clinical trials for a specific condition.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            max_results (Optional[int]): Stop after this many trials per query
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            
+        Returns:
+            pd.DataFrame: DataFrame containing all fetched trials, with the
+            query's instrumentation totals in ``attrs['metrics']``
+        """
+        started = time.perf_counter()
+        pager = self.client._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter
+        )
+        accumulator = _TrialAccumulator(self.parser.schema(), self.client.compact)
+        while not pager.done:
+            records = await self._run(self.client._fetch_page, pager)
+            self.client._accumulate(accumulator, records, pager.metrics)
+        return await self._run(
+            self.client._finish_frame, accumulator, pager.metrics, started
+        )
+    
+    async def gather_trials(self,
+                            conditions: Iterable[str],
+                            max_concurrency: Optional[int] = None,
+                            status: str = 'RECRUITING',
+                            page_size: Union[int, str] = 10,
+                            max_results: Optional[int] = None,
+                            fields: Optional[Union[str, Iterable[str]]] = None,
+                            advanced_filter: Optional[str] = None) -> Dict[str, pd.DataFrame]:
+        """
+        Fetch several conditions concurrently.
+        
+        Args:
+            conditions (Iterable[str]): Medical conditions to search for
+            max_concurrency (Optional[int]): Maximum number of queries in
+                flight (defaults to the client's max_concurrency)
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            max_results (Optional[int]): Stop after this many trials per query
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            
+        Returns:
+            Dict[str, pd.DataFrame]: Trials keyed by condition
+        """
+        conditions = list(conditions)
+        semaphore = asyncio.Semaphore(max_concurrency or self.max_concurrency)
+        
+        async def fetch(condition: str) -> pd.DataFrame:
+            async with semaphore:
+                return await self.fetch_trials(
+                    condition, status, page_size, max_results, fields, advanced_filter
+                )
+        
+        results = await asyncio.gather(*(fetch(c) for c in conditions))
+        return dict(zip(conditions, results))
@@ -0,0 +1,102 @@
+"""
+Offline ingest of the ClinicalTrials.gov bulk JSON export.
+
+ClinicalTrials.gov publishes the whole registry as a ZIP archive holding
+one JSON document per study, in the same structure the API returns. The
+members are streamed out of the archive without extracting them to disk
+and flattened in parallel worker processes.
+"""
+
+import multiprocessing
+import os
+import zipfile
+from concurrent.futures import ProcessPoolExecutor
+from itertools import chain
+from typing import Iterator, Optional, Tuple, Union
+
+import pandas as pd
+
+from .parallel import DEFAULT_CHUNK_SIZE, iter_flattened_chunks
+from .columnar import ColumnBuilder
+from .pyctrials import ClinicalTrialParser
+
+
+def iter_archive_studies(path: str) -> Iterator[bytes]:
+    """
+    Stream the raw JSON study documents of a bulk export archive.
+    
+    Args:
+        path (str): Path to the ZIP archive
+        
+    Yields:
+        bytes: JSON document of one study
+    """
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            if info.is_dir() or not info.filename.endswith('.json'):
+                continue
+            yield archive.read(info)
+
+
+def load_bulk_archive(path: str,
+                      output: Optional[str] = None,
+                      workers: Optional[int] = None,
+                      chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      parser: Optional[ClinicalTrialParser] = None,
+                      compact: bool = False,
+                      sites: bool = False) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
+    """
+    Load a ClinicalTrials.gov bulk JSON export into a DataFrame.
+    
+    Args:
+        path (str): Path to the ZIP archive with one JSON file per study
+        output (Optional[str]): Also write the trials to this file, as
+            Parquet for a '.parquet' extension and as CSV otherwise
+        workers (Optional[int]): Number of worker processes; defaults to the
+            number of CPUs, 0 or 1 flattens in the calling process
+        chunk_size (int): Number of studies handed to a worker at once
+        parser (Optional[ClinicalTrialParser]): Parser used to flatten each
+            study, including its registered extra fields
+        compact (bool): Use memory-efficient dtypes (categoricals, Int32
+            counts and Arrow-backed strings)
+        sites (bool): Also build the sites table of the studies in the same
+            pass over the archive
+        
+    Returns:
+        Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]: One row per
+        study, with the same columns as fetch_trials; with sites=True, a
+        tuple of the trials and their sites (as returned by fetch_sites)
+    """
+    parser = parser or ClinicalTrialParser()
+    if workers is None:
+        workers = os.cpu_count() or 1
+    
+    builder = ColumnBuilder(parser.schema())
+    site_builder = ColumnBuilder(ClinicalTrialParser.SITE_SCHEMA)
+    
+    def collect(chunks: Iterator) -> None:
+        for columns in chunks:
+            builder.extend_columns(columns)
+            if sites:
+                site_builder.extend(chain.from_iterable(columns['sites']))
+    
+    studies = iter_archive_studies(path)
+    if workers > 1:
+        # Spawned like the client's parse pool, since forking a process
+        # with threads and open sockets is unsafe
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            mp_context=multiprocessing.get_context('spawn')
+        ) as executor:
+            collect(iter_flattened_chunks(parser, studies, executor, chunk_size, sites))
+    else:
+        collect(iter_flattened_chunks(parser, studies, None, chunk_size, sites))
+    
+    if output is not None and output.endswith('.parquet'):
+        import pyarrow.parquet as pq
+        pq.write_table(builder.to_arrow(), output)
+    trials = builder.to_frame(compact)
+    if output is not None and not output.endswith('.parquet'):
+        trials.to_csv(output, index=False)
+    return (trials, site_builder.to_frame()) if sites else trials
+
@@ -0,0 +1,247 @@
+"""
+On-disk cache of raw ClinicalTrials.gov API responses.
+
+Responses are stored compressed, one file per request, keyed by the
+endpoint and its normalized query parameters (including the page token).
+Every entry is tagged with the registry data version (the
+``dataTimestamp`` of the version endpoint) it was downloaded under, so a
+single version check invalidates all stale entries at once. Entries can
+additionally expire after a TTL, and the least recently used ones are
+evicted when the cache grows beyond its size limit.
+"""
+
+import hashlib
+import json
+import os
+import tempfile
+import threading
+import time
+import zlib
+from typing import Dict, Optional
+
+DEFAULT_CACHE_DIR = os.path.join(
+    os.environ.get('XDG_CACHE_HOME', os.path.expanduser('~/.cache')),
+    'pyctrials'
+)
+
+
+class ResponseCache:
+    """Persistent, size-bounded LRU cache of API response payloads."""
+    
+    SUFFIX = '.json.z'
+    VERSION_FILE = 'data_version'
+    
+    def __init__(self,
+                 directory: Optional[str] = None,
+                 ttl: Optional[float] = None,
+                 max_bytes: int = 512 * 1024 * 1024):
+        """
+        Initialize the cache.
+        
+        Args:
+            directory (Optional[str]): Cache directory (defaults to
+                ~/.cache/pyctrials)
+            ttl (Optional[float]): Lifetime of an entry in seconds, or None
+                to keep entries until they are evicted or the data version
+                changes
+            max_bytes (int): Maximum total size of the stored entries
+        """
+        self.directory = os.path.expanduser(directory or DEFAULT_CACHE_DIR)
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.directory, exist_ok=True)
+        self._size = sum(os.path.getsize(path) for path in self._entries())
+        try:
+            with open(os.path.join(self.directory, self.VERSION_FILE)) as f:
+                self.data_version: Optional[str] = f.read().strip() or None
+        except OSError:
+            self.data_version = None
+    
+    def set_data_version(self, version: str) -> bool:
+        """
+        Record the current data version of the registry.
+        
+        When the version differs from the one the entries were downloaded
+        under, every entry is dropped.
+        
+        Args:
+            version (str): Data version, e.g. the API 'dataTimestamp'
+            
+        Returns:
+            bool: True if the version changed and the cache was invalidated
+        """
+        if version == self.data_version:
+            return False
+        self.clear()
+        path = os.path.join(self.directory, self.VERSION_FILE)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            f.write(version)
+        os.replace(tmp_path, path)
+        self.data_version = version
+        return True
+    
+    @staticmethod
+    def key(url: str, params: Optional[Dict] = None) -> str:
+        """
+        Build the cache key of a request.
+        
+        Args:
+            url (str): Endpoint URL
+            params (Optional[Dict]): Query parameters; unset values are ignored
+            
+        Returns:
+            str: Hex digest identifying the request
+        """
+        normalized = sorted(
+            (str(name), str(value))
+            for name, value in (params or {}).items()
+            if value is not None
+        )
+        raw = json.dumps([url, normalized], separators=(',', ':'))
+        return hashlib.sha256(raw.encode()).hexdigest()
+    
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, key + self.SUFFIX)
+    
+    def _entries(self):
+        with os.scandir(self.directory) as entries:
+            return [
+                entry.path for entry in entries
+                if entry.name.endswith(self.SUFFIX)
+            ]
+    
+    def get(self, url: str, params: Optional[Dict] = None) -> Optional[bytes]:
+        """
+        Look up a cached response.
+        
+        Args:
+            url (str): Endpoint URL
+            params (Optional[Dict]): Query parameters
+            
+        Returns:
+            Optional[bytes]: The response body, or None on a miss
+        """
+        path = self._path(self.key(url, params))
+        try:
+            with open(path, 'rb') as f:
+                header = json.loads(f.readline())
+                content = zlib.decompress(f.read())
+        except (OSError, ValueError, zlib.error):
+            content = None
+        
+        if content is not None:
+            expired = self.ttl is not None and time.time() - header['created'] > self.ttl
+            stale = header.get('version') != self.data_version
+            if expired or stale:
+                self._remove(path)
+                content = None
+        
+        with self._lock:
+            if content is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        # Refresh the modification time, which orders LRU eviction
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return content
+    
+    def set(self, url: str, params: Optional[Dict], content: bytes) -> None:
+        """
+        Store a response.
+        
+        Args:
+            url (str): Endpoint URL
+            params (Optional[Dict]): Query parameters
+            content (bytes): Response body
+        """
+        header = json.dumps({
+            'created': time.time(),
+            'version': self.data_version,
+            'url': url,
+        }).encode()
+        data = header + b'\n' + zlib.compress(content)
+        path = self._path(self.key(url, params))
+        
+        # Write atomically so concurrent readers never see partial entries
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        try:
+            previous = os.path.getsize(path)
+        except OSError:
+            previous = 0
+        os.replace(tmp_path, path)
+        
+        with self._lock:
+            self._size += len(data) - previous
+            over_limit = self._size > self.max_bytes
+        if over_limit:
+            self._evict()
+    
+    def _remove(self, path: str) -> None:
+        try:
+            size = os.path.getsize(path)
+            os.remove(path)
+        except OSError:
+            return
+        with self._lock:
+            self._size -= size
+    
+    def _evict(self) -> None:
+        """Remove least recently used entries until the cache fits its limit."""
+        entries = []
+        for path in self._entries():
+            try:
+                stat = os.stat(path)
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, path))
+        entries.sort()
+        
+        total = sum(size for _, size, _ in entries)
+        # Leave some headroom so that eviction does not run on every write
+        target = self.max_bytes * 0.9
+        for _, size, path in entries:
+            if total <= target:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                continue
+            total -= size
+        with self._lock:
+            self._size = total
+    
+    def clear(self) -> None:
+        """Remove every entry from the cache."""
+        for path in self._entries():
+            self._remove(path)
+        with self._lock:
+            self._size = 0
+    
+    def stats(self) -> Dict:
+        """
+        Report cache usage.
+        
+        Returns:
+            Dict: Hit and miss counters, hit rate, entry count, size in bytes
+            and data version
+        """
+        with self._lock:
+            hits, misses, size = self.hits, self.misses, self._size
+        lookups = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': hits / lookups if lookups else 0.0,
+            'entries': len(self._entries()),
+            'bytes': size,
+            'data_version': self.data_version,
+        }
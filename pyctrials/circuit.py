@@ -0,0 +1,275 @@
+"""
+Circuit breaker and hedged requests for API calls.
+
+The circuit breaker watches the outcome of recent requests. When the
+share of upstream failures (timeouts, connection errors, 429 and 5xx)
+among them crosses a threshold, it opens and every request fails at once
+with CircuitOpenError instead of each caller waiting through its retries.
+After a cool-down one probe request is let through, and its outcome
+closes the circuit again or keeps it open.
+
+Hedging bounds tail latency: a request still running after a high
+percentile of recently observed latencies is sent a second time, and
+whichever copy answers first is used.
+"""
+
+import threading
+import time
+from collections import Counter, deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Callable, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+from requests.exceptions import HTTPError, RequestException
+
+T = TypeVar('T')
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+
+class CircuitOpenError(RequestException):
+    """Raised without sending a request while the circuit is open."""
+
+
+class CircuitBreaker:
+    """Fail fast while the upstream error rate is too high."""
+    
+    def __init__(self,
+                 failure_threshold: float = 0.5,
+                 window: int = 20,
+                 min_requests: int = 10,
+                 reset_timeout: float = 30.0):
+        """
+        Initialize the breaker.
+        
+        Args:
+            failure_threshold (float): Share of failed requests among the
+                last `window` ones that opens the circuit
+            window (int): Number of recent outcomes considered
+            min_requests (int): Outcomes needed before the circuit may open
+            reset_timeout (float): Seconds the circuit stays open before a
+                probe request is let through
+        """
+        self.failure_threshold = failure_threshold
+        self.min_requests = min_requests
+        self.reset_timeout = reset_timeout
+        self.state = CLOSED
+        self.stats = Counter()
+        self._outcomes = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+    
+    @staticmethod
+    def is_failure(error: Exception) -> bool:
+        """
+        Tell whether an error reflects the health of the upstream.
+        
+        Args:
+            error (Exception): Error raised by a request
+            
+        Returns:
+            bool: False for client errors (4xx other than 429), True otherwise
+        """
+        if isinstance(error, HTTPError) and error.response is not None:
+            status = error.response.status_code
+            return status == 429 or status >= 500
+        return True
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Get a consistent copy of the breaker's counters.
+        
+        Returns:
+            Dict[str, int]: Times the circuit opened and closed, and requests
+            rejected while it was open
+        """
+        with self._lock:
+            return dict(self.stats)
+    
+    def _allow(self) -> Tuple[bool, bool]:
+        """
+        Decide whether a request may be sent.
+        
+        Returns:
+            Tuple[bool, bool]: Whether the request is admitted, and whether
+            it is the probe of a half-open circuit
+        """
+        with self._lock:
+            if self.state == OPEN:
+                if time.monotonic() - self._opened_at < self.reset_timeout:
+                    self.stats['rejected'] += 1
+                    return False, False
+                self.state = HALF_OPEN
+            if self.state == HALF_OPEN:
+                # Only one probe at a time while half-open
+                if self._probing:
+                    self.stats['rejected'] += 1
+                    return False, False
+                self._probing = True
+                return True, True
+            return True, False
+    
+    def _record(self, failed: bool, probe: bool = False) -> None:
+        with self._lock:
+            if probe:
+                self._probing = False
+                if failed:
+                    self._open()
+                else:
+                    self.state = CLOSED
+                    self._outcomes.clear()
+                    self.stats['closed'] += 1
+                return
+            if self.state != CLOSED:
+                # Requests admitted before the circuit opened finish later;
+                # only the probe decides when it closes again
+                return
+            self._outcomes.append(failed)
+            if (len(self._outcomes) >= self.min_requests
+                    and sum(self._outcomes) >= self.failure_threshold * len(self._outcomes)):
+                self._open()
+    
+    def _open(self) -> None:
+        self.state = OPEN
+        self._opened_at = time.monotonic()
+        self.stats['opened'] += 1
+    
+    def call(self, request: Callable[[], T]) -> T:
+        """
+        Send a request unless the circuit is open.
+        
+        Args:
+            request (Callable[[], T]): Sends the request and returns its result
+            
+        Returns:
+            T: Result of the request
+            
+        Raises:
+            CircuitOpenError: The circuit is open and the request was not sent
+        """
+        allowed, probe = self._allow()
+        if not allowed:
+            raise CircuitOpenError("Circuit open: too many recent upstream failures")
+        try:
+            result = request()
+        except RequestException as e:
+            self._record(self.is_failure(e), probe)
+            raise
+        except BaseException:
+            self._record(False, probe)
+            raise
+        self._record(False, probe)
+        return result
+
+
+class Hedger:
+    """Send a second copy of requests slower than a latency percentile."""
+    
+    def __init__(self,
+                 percentile: float = 95,
+                 min_samples: int = 20,
+                 window: int = 200,
+                 max_workers: int = 8):
+        """
+        Initialize the hedger.
+        
+        Args:
+            percentile (float): Latency percentile after which a request is
+                hedged
+            min_samples (int): Latencies observed before hedging starts
+            window (int): Number of recent latencies the percentile is
+                computed over
+            max_workers (int): Threads sending the requests and their hedges
+        """
+        self.percentile = percentile
+        self.min_samples = min_samples
+        self.stats = Counter()
+        self._latencies = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(
+            max_workers=max_workers,
+            thread_name_prefix='pyctrials-hedge'
+        )
+    
+    def threshold(self) -> Optional[float]:
+        """
+        Compute the current hedging delay.
+        
+        Returns:
+            Optional[float]: Seconds after which a request is hedged, or None
+            while too few latencies have been observed
+        """
+        with self._lock:
+            if len(self._latencies) < self.min_samples:
+                return None
+            return float(np.percentile(self._latencies, self.percentile))
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Get a consistent copy of the hedger's counters.
+        
+        Returns:
+            Dict[str, int]: Requests hedged, and hedges that answered first
+        """
+        with self._lock:
+            return dict(self.stats)
+    
+    def _timed(self,
+               request: Callable[[], T],
+               before: Optional[Callable[[], object]] = None) -> T:
+        if before is not None:
+            # Waits before sending (e.g. for a rate limiter) are not latency
+            before()
+        start = time.perf_counter()
+        result = request()
+        with self._lock:
+            self._latencies.append(time.perf_counter() - start)
+        return result
+    
+    def call(self,
+             request: Callable[[], T],
+             before_hedge: Optional[Callable[[], object]] = None) -> T:
+        """
+        Send a request, and a hedge if it is slower than the threshold.
+        
+        Args:
+            request (Callable[[], T]): Sends the request and returns its
+                result; it may be called twice concurrently
+            before_hedge (Optional[Callable[[], object]]): Called in the
+                hedge's thread before the second copy is sent, e.g. to take
+                a rate limiter token; its duration is not timed
+            
+        Returns:
+            T: Result of the first copy that succeeds
+        """
+        threshold = self.threshold()
+        if threshold is None:
+            return self._timed(request)
+        
+        primary = self._executor.submit(self._timed, request)
+        done, _ = wait([primary], timeout=threshold)
+        if done:
+            return primary.result()
+        
+        with self._lock:
+            self.stats['hedged'] += 1
+        hedge = self._executor.submit(self._timed, request, before_hedge)
+        pending = {primary, hedge}
+        while True:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            succeeded = [future for future in done if future.exception() is None]
+            if succeeded:
+                if hedge in succeeded and primary not in succeeded:
+                    with self._lock:
+                        self.stats['hedge_wins'] += 1
+                return succeeded[0].result()
+            if not pending:
+                # Both copies failed; report the last error
+                return done.pop().result()
+    
+    def close(self) -> None:
+        """Stop the request threads."""
+        self._executor.shutdown(wait=False)
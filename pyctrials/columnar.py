@@ -0,0 +1,371 @@
+"""
+Columnar builder for flattened clinical trials.
+
+Flattened studies are appended straight into one buffer per column of a
+fixed schema (integers into typed arrays with a validity mask) and turned
+into a pandas DataFrame or a pyarrow Table once, with explicit dtypes.
+Every page and every query therefore produces the same columns in the
+same order with the same types, whatever values happen to be present.
+
+'code' columns are interned while they are built: each distinct value is
+stored once and every row holds a small integer code, so they always come
+out as categoricals (dictionary arrays in Arrow).
+
+In compact mode low-cardinality enums become categoricals, counts become
+nullable Int32 and free text uses Arrow-backed strings (when pyarrow is
+installed), which shrinks large frames several times over.
+"""
+
+import time
+from array import array
+from itertools import chain
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+# Column kinds understood by the builder
+STR = 'str'
+CATEGORY = 'category'
+INT = 'int'
+FLOAT = 'float'
+CODE = 'code'
+DATE = 'date'
+LIST = 'list'
+OBJECT = 'object'
+
+
+def _compact_string_dtype() -> str:
+    """Arrow-backed strings when pyarrow is installed, nullable strings otherwise."""
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError:
+        return 'string'
+    return 'string[pyarrow]'
+
+
+class _IntBuffer:
+    """Growable int64 buffer with a validity mask."""
+    
+    def __init__(self):
+        self.values = array('q')
+        self.missing = bytearray()
+    
+    def append(self, value) -> None:
+        try:
+            self.values.append(int(value))
+            self.missing.append(0)
+        except (TypeError, ValueError, OverflowError):
+            self.values.append(0)
+            self.missing.append(1)
+    
+    def extend(self, values: Iterable) -> None:
+        for value in values:
+            self.append(value)
+    
+    def __len__(self) -> int:
+        return len(self.values)
+    
+    def to_array(self) -> pd.arrays.IntegerArray:
+        values = np.frombuffer(self.values, dtype=np.int64) if self.values else np.zeros(0, np.int64)
+        mask = np.frombuffer(bytes(self.missing), dtype=np.bool_) if self.missing else np.zeros(0, np.bool_)
+        return pd.arrays.IntegerArray(values.copy(), mask.copy())
+
+
+class _CodeBuffer:
+    """Growable buffer of interned values stored as int32 codes (-1 for missing)."""
+    
+    def __init__(self):
+        self.codes = array('i')
+        self.categories: Dict[str, int] = {}
+    
+    def append(self, value) -> None:
+        if value is None:
+            self.codes.append(-1)
+            return
+        code = self.categories.get(value)
+        if code is None:
+            code = self.categories[value] = len(self.categories)
+        self.codes.append(code)
+    
+    def extend(self, values: Iterable) -> None:
+        for value in values:
+            self.append(value)
+    
+    def __len__(self) -> int:
+        return len(self.codes)
+    
+    def code_array(self) -> np.ndarray:
+        return np.frombuffer(self.codes, dtype=np.int32).copy() if self.codes else np.zeros(0, np.int32)
+    
+    def to_array(self) -> pd.Categorical:
+        return pd.Categorical.from_codes(self.code_array(), list(self.categories))
+
+
+def _float_array(values: List) -> np.ndarray:
+    """Convert values to float64, with NaN for missing or non-numeric ones."""
+    return pd.to_numeric(pd.Series(values, dtype=object), errors='coerce').to_numpy(np.float64)
+
+
+# Formats of the API's partial dates, from the most to the least precise
+DATE_FORMATS = [('day', '%Y-%m-%d'), ('month', '%Y-%m'), ('year', '%Y')]
+DATE_PRECISIONS = [precision for precision, _ in reversed(DATE_FORMATS)]
+
+
+def normalize_dates(values: Iterable) -> Tuple[np.ndarray, pd.Categorical]:
+    """
+    Parse partial API dates ('2023', '2023-05' or '2023-05-17') with explicit formats.
+    
+    Each distinct string is parsed once and the results are broadcast back
+    with its codes, so repeated dates cost a hash lookup. Month and year
+    dates map to the first day of the period.
+    
+    Args:
+        values (Iterable): Date strings, None where a study has none
+        
+    Returns:
+        Tuple[np.ndarray, pd.Categorical]: datetime64 values (NaT where
+        missing or unparseable) and the precision of each date ('year',
+        'month' or 'day', missing where the date is)
+    """
+    codes, uniques = pd.factorize(pd.Series(values, dtype=object))
+    uniques = pd.Series(uniques, dtype=object)
+    parsed = pd.Series(pd.NaT, index=uniques.index, dtype='datetime64[ns]')
+    precision = np.full(len(uniques) + 1, -1, dtype=np.int8)
+    for name, date_format in DATE_FORMATS:
+        pending = parsed.isna().to_numpy()
+        if not pending.any():
+            break
+        attempt = pd.to_datetime(uniques[pending], format=date_format, errors='coerce')
+        parsed[pending] = attempt
+        matched = np.flatnonzero(pending)[attempt.notna().to_numpy()]
+        precision[matched] = DATE_PRECISIONS.index(name)
+    
+    # Code -1 (missing) picks the trailing NaT / missing precision
+    dates = np.append(parsed.to_numpy(), np.datetime64('NaT', 'ns'))[codes]
+    return dates, pd.Categorical.from_codes(precision[codes], DATE_PRECISIONS)
+
+
+def _new_buffer(kind: str):
+    if kind == INT:
+        return _IntBuffer()
+    if kind == CODE:
+        return _CodeBuffer()
+    return []
+
+
+class ColumnBuilder:
+    """Accumulate flattened trials into typed column buffers."""
+    
+    def __init__(self, schema: Dict[str, str]):
+        """
+        Initialize the builder.
+        
+        Args:
+            schema (Dict[str, str]): Column kinds ('str', 'category', 'code',
+                'int', 'float', 'date', 'list' or 'object') keyed by column
+                name, in output order
+        """
+        self.schema = dict(schema)
+        self._buffers = {
+            name: _new_buffer(kind) for name, kind in self.schema.items()
+        }
+        self._rows = 0
+        # Seconds spent in stages of the last to_frame() call
+        self.timings: Dict[str, float] = {}
+    
+    def __len__(self) -> int:
+        return self._rows
+    
+    def append(self, record: Dict) -> None:
+        """
+        Append one flattened trial; columns it lacks are left empty.
+        
+        Args:
+            record (Dict): Flattened trial data
+        """
+        get = record.get
+        for name, buffer in self._buffers.items():
+            buffer.append(get(name))
+        self._rows += 1
+    
+    def extend(self, records: Iterable[Dict]) -> 'ColumnBuilder':
+        """
+        Append flattened trials.
+        
+        Args:
+            records (Iterable[Dict]): Flattened trial data
+            
+        Returns:
+            ColumnBuilder: The builder itself
+        """
+        for record in records:
+            self.append(record)
+        return self
+    
+    def extend_columns(self, columns: Dict[str, List]) -> 'ColumnBuilder':
+        """
+        Append trials given in columnar form.
+        
+        Args:
+            columns (Dict[str, List]): Values of each column, all of the same
+                length; schema columns that are absent are left empty
+            
+        Returns:
+            ColumnBuilder: The builder itself
+        """
+        size = len(next(iter(columns.values()), []))
+        for name, buffer in self._buffers.items():
+            values = columns.get(name)
+            buffer.extend(values if values is not None else [None] * size)
+        self._rows += size
+        return self
+    
+    def columns(self) -> List[str]:
+        """
+        List the output columns: the schema's, each date followed by its precision.
+        
+        Returns:
+            List[str]: Column names in output order
+        """
+        names = []
+        for name, kind in self.schema.items():
+            names.append(name)
+            if kind == DATE:
+                names.append(f'{name}_precision')
+        return names
+    
+    def to_frame(self, compact: bool = False) -> pd.DataFrame:
+        """
+        Build a DataFrame with the schema's columns and dtypes.
+        
+        Args:
+            compact (bool): Use memory-efficient dtypes: categoricals for
+                'category' columns, Int32 for 'int' columns and Arrow-backed
+                strings for 'str' columns
+            
+        Returns:
+            pd.DataFrame: One row per appended trial
+        """
+        string_dtype = _compact_string_dtype() if compact else object
+        data = {}
+        dates_seconds = 0.0
+        for name, kind in self.schema.items():
+            buffer = self._buffers[name]
+            if kind == INT:
+                values = buffer.to_array()
+                data[name] = values.astype('Int32') if compact else values
+            elif kind == CODE:
+                data[name] = buffer.to_array()
+            elif kind == FLOAT:
+                data[name] = _float_array(buffer)
+            elif kind == DATE:
+                start = time.perf_counter()
+                data[name], data[f'{name}_precision'] = normalize_dates(buffer)
+                dates_seconds += time.perf_counter() - start
+            elif kind == CATEGORY and compact:
+                data[name] = pd.Categorical(buffer)
+            elif kind in (STR, CATEGORY):
+                data[name] = pd.Series(buffer, dtype=string_dtype)
+            else:
+                data[name] = pd.Series(buffer, dtype=object)
+        self.timings = {'dates': dates_seconds}
+        return pd.DataFrame(data, columns=self.columns())
+    
+    def to_arrow(self):
+        """
+        Build a pyarrow Table with a fixed schema.
+        
+        Returns:
+            pyarrow.Table: One row per appended trial
+        """
+        try:
+            import pyarrow as pa
+        except ImportError as e:
+            raise ImportError("to_arrow() requires pyarrow: pip install pyarrow") from e
+        
+        arrays, fields = [], []
+        for name, kind in self.schema.items():
+            buffer = self._buffers[name]
+            if kind == INT:
+                array_ = pa.array(
+                    np.frombuffer(buffer.values, dtype=np.int64) if buffer.values else [],
+                    type=pa.int64(),
+                    mask=np.frombuffer(bytes(buffer.missing), dtype=np.bool_) if buffer.missing else None
+                )
+            elif kind == CODE:
+                codes = buffer.code_array()
+                array_ = pa.DictionaryArray.from_arrays(
+                    pa.array(codes, type=pa.int32(), mask=codes < 0),
+                    pa.array(list(buffer.categories), type=pa.string())
+                )
+            elif kind == FLOAT:
+                array_ = pa.array(_float_array(buffer), type=pa.float64(), from_pandas=True)
+            elif kind == DATE:
+                dates, precision = normalize_dates(buffer)
+                array_ = pa.array(dates, type=pa.timestamp('ns'))
+                arrays.append(array_)
+                fields.append(pa.field(name, array_.type))
+                name, array_ = f'{name}_precision', pa.array(precision).cast(
+                    pa.dictionary(pa.int8(), pa.string())
+                )
+            elif kind == CATEGORY:
+                array_ = pa.array(buffer, type=pa.string()).dictionary_encode()
+            elif kind == LIST:
+                array_ = pa.array(buffer, type=pa.list_(pa.string()))
+            elif kind == STR:
+                array_ = pa.array(buffer, type=pa.string())
+            else:
+                array_ = pa.array(buffer)
+            arrays.append(array_)
+            fields.append(pa.field(name, array_.type))
+        return pa.Table.from_arrays(arrays, schema=pa.schema(fields))
+
+
+def explode_column(trials: pd.DataFrame,
+                   column: str,
+                   key: str = 'nct_id') -> pd.DataFrame:
+    """
+    Explode a list column into a child table keyed by the trial ID.
+    
+    Args:
+        trials (pd.DataFrame): Trials with a list column
+        column (str): Name of the list column
+        key (str): Column identifying each trial
+        
+    Returns:
+        pd.DataFrame: One row per list element, with the key and the value
+    """
+    lists = [value if isinstance(value, list) else [] for value in trials[column]]
+    lengths = np.fromiter((len(value) for value in lists), dtype=np.int64, count=len(lists))
+    return pd.DataFrame({
+        key: np.repeat(trials[key].to_numpy(), lengths),
+        column: pd.Series(list(chain.from_iterable(lists)), dtype=object),
+    })
+
+
+def child_tables(trials: pd.DataFrame,
+                 key: str = 'nct_id',
+                 schema: Optional[Dict[str, str]] = None) -> Dict[str, pd.DataFrame]:
+    """
+    Explode every list column of a trials frame into its own child table.
+    
+    Args:
+        trials (pd.DataFrame): Trials fetched with list columns
+        key (str): Column identifying each trial
+        schema (Optional[Dict[str, str]]): Schema the trials were built
+            with; defaults to the parser's schema with list columns
+        
+    Returns:
+        Dict[str, pd.DataFrame]: Child tables keyed by column name, one for
+        every list column of the schema present in the frame (empty tables
+        for an empty frame)
+    """
+    if schema is None:
+        from .pyctrials import ClinicalTrialParser
+        schema = ClinicalTrialParser(list_columns=True).schema()
+    return {
+        column: explode_column(trials, column, key)
+        for column, kind in schema.items()
+        if kind == LIST and column in trials.columns
+    }
@@ -0,0 +1,92 @@
+"""
+Per-request instrumentation of ClinicalTrialsAPI.
+
+The client emits one event per HTTP request and per processing stage of a
+page. Hooks registered with ``ClinicalTrialsAPI.add_hook`` receive every
+event as ``hook(event, data)``:
+
+- ``request``: ``url``, ``status`` (None when no response arrived),
+  ``bytes``, ``attempt``, ``cache_hit``, ``throttle_seconds`` (wait for the
+  rate limiter), ``wait_seconds`` (until the response headers, including
+  DNS and connect for new connections), ``transfer_seconds`` (reading the
+  body) and ``seconds`` (the whole request, after the rate limiter wait);
+  ``error`` on failure
+- ``retry``: ``attempt`` and ``error`` before a page is requested again
+- ``decode``: ``seconds`` and ``bytes`` of JSON decoding of a page
+- ``flatten``: ``seconds`` and ``studies`` of flattening a page
+- ``accumulate``: ``seconds`` and ``studies`` of adding a page to the result
+- ``dates``: ``seconds`` and ``rows`` of the final date normalization
+- ``build``: ``seconds`` and ``rows`` of building the final DataFrame
+
+The events of one query are also summed into a QueryMetrics object, which
+fetch_trials attaches to the returned DataFrame as ``df.attrs['metrics']``.
+"""
+
+import threading
+from typing import Callable, Dict
+
+Hook = Callable[[str, Dict], None]
+
+# Events whose duration is summed into '<event>_seconds'
+TIMED_EVENTS = ('decode', 'flatten', 'accumulate', 'dates', 'build')
+
+
+class QueryMetrics:
+    """Thread-safe totals of the instrumentation events of one query."""
+    
+    def __init__(self):
+        self._totals: Dict[str, float] = {}
+        self._lock = threading.Lock()
+    
+    def _add(self, name: str, value: float) -> None:
+        self._totals[name] = self._totals.get(name, 0) + value
+    
+    def add(self, event: str, data: Dict) -> None:
+        """
+        Add an event to the totals.
+        
+        Args:
+            event (str): Event name
+            data (Dict): Event data
+        """
+        with self._lock:
+            if event == 'request':
+                self._add('requests', 1)
+                self._add('bytes', data.get('bytes', 0))
+                self._add('request_seconds', data.get('seconds', 0.0))
+                self._add('throttle_seconds', data.get('throttle_seconds', 0.0))
+                if data.get('cache_hit'):
+                    self._add('cache_hits', 1)
+                if 'error' in data:
+                    self._add('request_errors', 1)
+            elif event == 'retry':
+                self._add('retries', 1)
+            elif event in TIMED_EVENTS:
+                self._add(f'{event}_seconds', data.get('seconds', 0.0))
+                if event == 'flatten':
+                    self._add('studies', data.get('studies', 0))
+    
+    def merge(self, other: 'QueryMetrics') -> 'QueryMetrics':
+        """
+        Add the totals of another query.
+        
+        Args:
+            other (QueryMetrics): Totals to add
+            
+        Returns:
+            QueryMetrics: The metrics themselves
+        """
+        for name, value in other.to_dict().items():
+            with self._lock:
+                self._add(name, value)
+        return self
+    
+    def to_dict(self) -> Dict[str, float]:
+        """
+        Get the totals.
+        
+        Returns:
+            Dict[str, float]: Totals keyed by name
+        """
+        with self._lock:
+            return dict(self._totals)
@@ -0,0 +1,363 @@
+"""
+In-process metrics registry with Prometheus text export.
+
+A MetricsRegistry is an instrumentation hook: registered on a client, it
+turns the client's events into request counters, latency histograms,
+cache hit counts and parse totals. The counters of the client's retry
+policy, circuit breaker and hedger are read when the registry is
+rendered. The registry can be rendered in the Prometheus text exposition
+format, written atomically to a file (e.g. for the node_exporter textfile
+collector) or served from a local HTTP endpoint.
+"""
+
+import os
+import tempfile
+import threading
+import weakref
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .instrument import TIMED_EVENTS
+
+DEFAULT_BUCKETS = (0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+Labels = Tuple[Tuple[str, str], ...]
+
+
+def _labels(labels: Dict[str, object]) -> Labels:
+    return tuple(sorted((name, str(value)) for name, value in labels.items()))
+
+
+def _format_labels(labels: Labels, extra: Optional[Tuple[str, str]] = None) -> str:
+    pairs = list(labels) + ([extra] if extra else [])
+    if not pairs:
+        return ''
+    escaped = (
+        f'{name}="' + value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n') + '"'
+        for name, value in pairs
+    )
+    return '{' + ','.join(escaped) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value != value:
+        return 'NaN'
+    if value in (float('inf'), float('-inf')):
+        return '+Inf' if value > 0 else '-Inf'
+    return repr(float(value)) if value != int(value) else str(int(value))
+
+
+class Counter:
+    """Monotonic counter, one value per label set."""
+    
+    kind = 'counter'
+    
+    def __init__(self, name: str, documentation: str):
+        self.name = name
+        self.documentation = documentation
+        self._values: Dict[Labels, float] = {}
+        self._lock = threading.Lock()
+    
+    def inc(self, value: float = 1.0, **labels) -> None:
+        """
+        Increase the counter.
+        
+        Args:
+            value (float): Amount to add
+            **labels: Label values of the series
+        """
+        key = _labels(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + value
+    
+    def set(self, value: float, **labels) -> None:
+        """
+        Set a series to a total counted elsewhere.
+        
+        Args:
+            value (float): Current total
+            **labels: Label values of the series
+        """
+        with self._lock:
+            self._values[_labels(labels)] = value
+    
+    def value(self, **labels) -> float:
+        """Current value of a series (0 when it was never increased)."""
+        with self._lock:
+            return self._values.get(_labels(labels), 0.0)
+    
+    def samples(self) -> List[Tuple[str, Labels, Optional[Tuple[str, str]], float]]:
+        with self._lock:
+            return [(self.name, labels, None, value) for labels, value in sorted(self._values.items())]
+
+
+class Gauge(Counter):
+    """Value that may go up and down, one per label set."""
+    
+    kind = 'gauge'
+
+
+class Histogram:
+    """Distribution of observed values in cumulative buckets, per label set."""
+    
+    kind = 'histogram'
+    
+    def __init__(self,
+                 name: str,
+                 documentation: str,
+                 buckets: Iterable[float] = DEFAULT_BUCKETS):
+        self.name = name
+        self.documentation = documentation
+        self.buckets = sorted(buckets)
+        self._series: Dict[Labels, List] = {}
+        self._lock = threading.Lock()
+    
+    def observe(self, value: float, **labels) -> None:
+        """
+        Record one observation.
+        
+        Args:
+            value (float): Observed value
+            **labels: Label values of the series
+        """
+        key = _labels(labels)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                series = self._series[key] = [[0] * len(self.buckets), 0.0, 0]
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    series[0][i] += 1
+            series[1] += value
+            series[2] += 1
+    
+    def count(self, **labels) -> int:
+        """Number of observations of a series."""
+        with self._lock:
+            series = self._series.get(_labels(labels))
+            return series[2] if series else 0
+    
+    def samples(self) -> List[Tuple[str, Labels, Optional[Tuple[str, str]], float]]:
+        samples = []
+        with self._lock:
+            for labels, (counts, total, count) in sorted(self._series.items()):
+                for bound, bucket in zip(self.buckets, counts):
+                    samples.append((f'{self.name}_bucket', labels, ('le', _format_value(bound)), bucket))
+                samples.append((f'{self.name}_bucket', labels, ('le', '+Inf'), count))
+                samples.append((f'{self.name}_sum', labels, None, total))
+                samples.append((f'{self.name}_count', labels, None, count))
+        return samples
+
+
+class MetricsRegistry:
+    """Client metrics fed by instrumentation events."""
+    
+    def __init__(self, buckets: Iterable[float] = DEFAULT_BUCKETS):
+        """
+        Initialize the registry.
+        
+        Args:
+            buckets (Iterable[float]): Upper bounds in seconds of the
+                request latency histogram buckets
+        """
+        self.requests = Counter(
+            'pyctrials_requests_total',
+            'API requests by endpoint, status and source (network or cache)'
+        )
+        self.request_seconds = Histogram(
+            'pyctrials_request_duration_seconds',
+            'Latency of network requests to the API',
+            buckets
+        )
+        self.response_bytes = Counter(
+            'pyctrials_response_bytes_total',
+            'Bytes of API responses by endpoint and source'
+        )
+        self.retries = Counter('pyctrials_retries_total', 'Page requests sent again after a failure')
+        self.studies = Counter('pyctrials_studies_parsed_total', 'Studies flattened')
+        self.rows = Counter('pyctrials_rows_total', 'Rows of the DataFrames returned to callers')
+        self.stage_seconds = Counter(
+            'pyctrials_stage_seconds_total',
+            'Time spent in each processing stage (decode, flatten, accumulate, dates, build)'
+        )
+        self.budget_exhausted = Counter(
+            'pyctrials_retry_budget_exhausted_total',
+            'Retries refused because the retry budget was spent'
+        )
+        self.circuit_state = Gauge(
+            'pyctrials_circuit_state',
+            'Circuit breakers in each state (closed, half_open, open)'
+        )
+        self.circuit_opened = Counter('pyctrials_circuit_opened_total', 'Times a circuit opened')
+        self.circuit_rejected = Counter(
+            'pyctrials_circuit_rejected_total',
+            'Requests failed without being sent because the circuit was open'
+        )
+        self.hedges = Counter('pyctrials_hedged_requests_total', 'Requests sent a second time')
+        self.hedge_wins = Counter(
+            'pyctrials_hedge_wins_total',
+            'Hedged requests answered first by the second copy'
+        )
+        self._metrics = [
+            self.requests, self.request_seconds, self.response_bytes, self.retries,
+            self.studies, self.rows, self.stage_seconds, self.budget_exhausted,
+            self.circuit_state, self.circuit_opened, self.circuit_rejected,
+            self.hedges, self.hedge_wins,
+        ]
+        # Components of the tracked clients; shared ones are counted once
+        self._policies = weakref.WeakSet()
+        self._breakers = weakref.WeakSet()
+        self._hedgers = weakref.WeakSet()
+        # Final counts of collected components, which keep the totals monotonic
+        self._retired: Dict[str, int] = {}
+        # Reentrant: a finalizer may run during garbage collection in collect()
+        self._lock = threading.RLock()
+    
+    def track(self, client) -> None:
+        """
+        Export the counters of a client's resilience components.
+        
+        The retry budget, circuit breaker and hedging counters are read
+        whenever the registry is rendered. When a client is discarded, the
+        last counts of its components stay in the totals.
+        
+        Args:
+            client (ClinicalTrialsAPI): Client to track; clients created with
+                this registry as their metrics are tracked automatically
+        """
+        self._watch(self._policies, client.retry_policy)
+        if client.circuit_breaker is not None:
+            self._watch(self._breakers, client.circuit_breaker)
+        if client.hedger is not None:
+            self._watch(self._hedgers, client.hedger)
+    
+    def _watch(self, components: weakref.WeakSet, component) -> None:
+        with self._lock:
+            if component in components:
+                return
+            components.add(component)
+        # The stats Counter outlives the component, so its final counts are
+        # still readable when the component is collected
+        weakref.finalize(component, self._retire, component.stats)
+    
+    def _retire(self, stats: Dict[str, int]) -> None:
+        with self._lock:
+            for name, count in stats.items():
+                self._retired[name] = self._retired.get(name, 0) + count
+    
+    def _total(self, counts: List[Dict[str, int]], name: str) -> int:
+        return self._retired.get(name, 0) + sum(c.get(name, 0) for c in counts)
+    
+    def collect(self) -> None:
+        """Update the series read from the tracked clients' components."""
+        breakers = list(self._breakers)
+        with self._lock:
+            policy_counts = [policy.counts() for policy in self._policies]
+            breaker_counts = [breaker.counts() for breaker in breakers]
+            hedger_counts = [hedger.counts() for hedger in self._hedgers]
+            self.budget_exhausted.set(self._total(policy_counts, 'budget_exhausted'))
+            self.circuit_opened.set(self._total(breaker_counts, 'opened'))
+            self.circuit_rejected.set(self._total(breaker_counts, 'rejected'))
+            self.hedges.set(self._total(hedger_counts, 'hedged'))
+            self.hedge_wins.set(self._total(hedger_counts, 'hedge_wins'))
+        for state in ('closed', 'half_open', 'open'):
+            self.circuit_state.set(sum(b.state == state for b in breakers), state=state)
+    
+    def __call__(self, event: str, data: Dict) -> None:
+        """
+        Record an instrumentation event; makes the registry a client hook.
+        
+        Args:
+            event (str): Event name
+            data (Dict): Event data
+        """
+        if event == 'request':
+            endpoint = data.get('url', '').rstrip('/').rsplit('/', 1)[-1]
+            source = 'cache' if data.get('cache_hit') else 'network'
+            status = data.get('status') or 'error'
+            self.requests.inc(endpoint=endpoint, status=status, source=source)
+            self.response_bytes.inc(data.get('bytes', 0), endpoint=endpoint, source=source)
+            if source == 'network':
+                self.request_seconds.observe(data.get('seconds', 0.0), endpoint=endpoint)
+        elif event == 'retry':
+            self.retries.inc()
+        elif event in TIMED_EVENTS:
+            self.stage_seconds.inc(data.get('seconds', 0.0), stage=event)
+            if event == 'flatten':
+                self.studies.inc(data.get('studies', 0))
+            elif event == 'build':
+                self.rows.inc(data.get('rows', 0))
+    
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+        
+        Returns:
+            str: Exposition text
+        """
+        self.collect()
+        lines = []
+        for metric in self._metrics:
+            lines.append(f'# HELP {metric.name} {metric.documentation}')
+            lines.append(f'# TYPE {metric.name} {metric.kind}')
+            for name, labels, extra, value in metric.samples():
+                lines.append(f'{name}{_format_labels(labels, extra)} {_format_value(value)}')
+        return '\n'.join(lines) + '\n'
+    
+    def write(self, path: str) -> None:
+        """
+        Write the metrics to a file, replacing it atomically.
+        
+        Args:
+            path (str): Output file, e.g. in the node_exporter textfile
+                collector directory (with a '.prom' extension)
+        """
+        directory = os.path.dirname(os.path.abspath(path))
+        fd, tmp_path = tempfile.mkstemp(dir=directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(self.render())
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+    
+    def serve(self, port: int = 9464, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+        """
+        Serve the metrics over HTTP from a background thread.
+        
+        Args:
+            port (int): Port to listen on (0 picks a free one)
+            host (str): Address to bind; the default only accepts local
+                connections
+            
+        Returns:
+            ThreadingHTTPServer: Running server; call shutdown() to stop it
+        """
+        registry = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+                    self.send_error(404)
+                    return
+                body = registry.render().encode()
+                self.send_response(200)
+                self.send_header('Content-Type', CONTENT_TYPE)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        server = ThreadingHTTPServer((host, port), Handler)
+        server.daemon_threads = True
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        return server
+
+
+# Registry shared by the clients created with metrics=True
+REGISTRY = MetricsRegistry()
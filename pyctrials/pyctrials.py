@@ -9,27 +9,240 @@ License: MIT
 """
 
 import json
+import logging
+import multiprocessing
+import os
+import pickle
+import queue
+import re
+import threading
 import time
-from typing import List, Dict, Tuple, Optional, Union
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from datetime import date, datetime, timedelta, timezone
+from itertools import chain
+from typing import Any, Callable, List, Dict, Iterable, Iterator, Tuple, Optional, Union
 import pandas as pd
 import requests
-from requests.exceptions import RequestException
+from requests.adapters import HTTPAdapter
+from requests.exceptions import RequestException, Timeout
+from urllib3.util.retry import Retry
+
+from .cache import ResponseCache
+from .circuit import CircuitBreaker, Hedger
+from .instrument import Hook, QueryMetrics
+from .metrics import REGISTRY, MetricsRegistry
+from .ratelimit import RateLimiter
+from .retry import RetryPolicy
+from .columnar import CATEGORY, CODE, DATE, FLOAT, INT, LIST, OBJECT, STR, ColumnBuilder
+from .store import PageSpool, TrialStore
+
+# Pick the fastest available JSON decoder once, at import time. All of them
+# accept the raw response bytes, which avoids a bytes-to-str decode per page.
+try:
+    import orjson
+    json_loads: Callable[[Union[bytes, str]], Any] = orjson.loads
+    JSON_BACKEND = 'orjson'
+except ImportError:
+    try:
+        import msgspec
+        json_loads = msgspec.json.decode
+        JSON_BACKEND = 'msgspec'
+    except ImportError:
+        json_loads = json.loads
+        JSON_BACKEND = 'json'
+
+logger = logging.getLogger(__name__)
+
+# Flattened page: one dict per study, or columns when flattened in a worker
+Page = Union[List[Dict], Dict[str, List]]
+
+# Token of the next page, found without decoding the page. Quotes inside
+# JSON strings are escaped, so only the top-level key can match.
+NEXT_PAGE_TOKEN = re.compile(rb'"nextPageToken"\s*:\s*"((?:[^"\\]|\\.)*)"')
+
+
+def _page_length(page: Page) -> int:
+    if isinstance(page, dict):
+        return len(next(iter(page.values()), []))
+    return len(page)
+
 
 class ClinicalTrialParser:
     """Parser for clinical trial data from ClinicalTrials.gov API responses."""
     
+    # API fields read by flatten_trial, keyed by the column they fill
+    FIELDS = {
+        'nct_id': 'protocolSection.identificationModule.nctId',
+        'org_study_id': 'protocolSection.identificationModule.orgStudyIdInfo.id',
+        'brief_title': 'protocolSection.identificationModule.briefTitle',
+        'overall_status': 'protocolSection.statusModule.overallStatus',
+        'last_known_status': 'protocolSection.statusModule.lastKnownStatus',
+        'start_date': 'protocolSection.statusModule.startDateStruct.date',
+        'completion_date': 'protocolSection.statusModule.completionDateStruct.date',
+        'sponsor': 'protocolSection.sponsorCollaboratorsModule.leadSponsor.name',
+        'brief_summary': 'protocolSection.descriptionModule.briefSummary',
+        'conditions': 'protocolSection.conditionsModule.conditions',
+        'keywords': 'protocolSection.conditionsModule.keywords',
+        'enrollment_count': 'protocolSection.designModule.enrollmentInfo.count',
+        'study_type': 'protocolSection.designModule.studyType',
+        'phase': 'protocolSection.designModule.phases',
+        'locations': 'protocolSection.contactsLocationsModule.locations',
+    }
+    
+    # Kind of each column for the columnar builder; other columns are strings
+    COLUMN_TYPES = {
+        'overall_status': CATEGORY,
+        'last_known_status': CATEGORY,
+        'sponsor': CATEGORY,
+        'study_type': CATEGORY,
+        'phase': CATEGORY,
+        'enrollment_count': INT,
+        'start_date': DATE,
+        'completion_date': DATE,
+    }
+    
+    # Multi-valued columns, joined into strings unless list_columns is set
+    LIST_COLUMNS = ['conditions', 'keywords', 'phase', 'locations']
+    
+    # Columns of the sites table built by flatten_sites, one row per location
+    SITE_SCHEMA = {
+        'nct_id': STR,
+        'facility': STR,
+        'city': CODE,
+        'state': STR,
+        'country': CODE,
+        'status': CATEGORY,
+        'latitude': FLOAT,
+        'longitude': FLOAT,
+    }
+    
+    def __init__(self, list_columns: bool = False):
+        """
+        Initialize the parser.
+        
+        Args:
+            list_columns (bool): Keep conditions, keywords, phases and
+                locations as lists instead of comma-separated strings
+        """
+        self.list_columns = list_columns
+        self.extra_fields: Dict[str, str] = {}
+    
+    def register_field(self, column: str, path: str) -> None:
+        """
+        Extract an additional API field into its own column.
+        
+        Registered fields are added to the default field projection of
+        ClinicalTrialsAPI, so they are downloaded automatically.
+        
+        Args:
+            column (str): Name of the column to fill
+            path (str): Dotted path of the field in the study document
+                (e.g., 'protocolSection.designModule.designInfo.allocation')
+        """
+        self.extra_fields[column] = path
+    
+    def config(self) -> Dict:
+        """
+        Describe the settings that change the shape of flattened records.
+        
+        Returns:
+            Dict: The list_columns setting and the registered extra fields
+        """
+        return {'list_columns': self.list_columns, 'extra_fields': dict(self.extra_fields)}
+    
+    def fields(self) -> List[str]:
+        """
+        List the API fields needed to fill every extracted column.
+        
+        Returns:
+            List[str]: Dotted field paths, suitable for the API 'fields' parameter
+        """
+        paths = list(self.FIELDS.values()) + list(self.extra_fields.values())
+        return list(dict.fromkeys(paths))
+    
+    def schema(self) -> Dict[str, str]:
+        """
+        Describe the columns produced by flatten.
+        
+        Returns:
+            Dict[str, str]: Column kinds ('str', 'category', 'int', 'date',
+            'list' or 'object') keyed by column name, in output order
+        """
+        schema = {
+            column: self.COLUMN_TYPES.get(column, STR) for column in self.FIELDS
+        }
+        if self.list_columns:
+            schema.update((column, LIST) for column in self.LIST_COLUMNS)
+        for column in self.extra_fields:
+            schema.setdefault(column, OBJECT)
+        return schema
+    
+    def flatten(self, trial: Dict, sites: bool = False) -> Dict:
+        """
+        Flatten a trial, including the registered extra fields.
+        
+        Args:
+            trial (Dict): Raw trial data from the API
+            sites (bool): Also flatten the trial's locations into site rows,
+                returned under the 'sites' key
+            
+        Returns:
+            Dict: Flattened trial data
+        """
+        flattened = self.flatten_trial(trial, self.list_columns)
+        for column, path in self.extra_fields.items():
+            value = trial
+            for key in path.split('.'):
+                value = value.get(key) if isinstance(value, dict) else None
+            flattened[column] = value
+        if sites:
+            flattened['sites'] = self.flatten_sites(trial)
+        return flattened
+    
+    @staticmethod
+    def flatten_sites(trial: Dict) -> List[Dict]:
+        """
+        Flatten the locations of a clinical trial into site rows.
+        
+        Args:
+            trial (Dict): Raw trial data from the API
+            
+        Returns:
+            List[Dict]: One row per location with the SITE_SCHEMA columns
+        """
+        protocol = trial.get('protocolSection', {})
+        nct_id = protocol.get('identificationModule', {}).get('nctId')
+        sites = []
+        for loc in protocol.get('contactsLocationsModule', {}).get('locations', []):
+            geo = loc.get('geoPoint') or {}
+            sites.append({
+                'nct_id': nct_id,
+                'facility': loc.get('facility'),
+                'city': loc.get('city'),
+                'state': loc.get('state'),
+                'country': loc.get('country'),
+                'status': loc.get('status'),
+                'latitude': geo.get('lat'),
+                'longitude': geo.get('lon'),
+            })
+        return sites
+    
     @staticmethod
-    def flatten_trial(trial: Dict) -> Dict:
+    def flatten_trial(trial: Dict, list_columns: bool = False) -> Dict:
         """
         Flatten a single clinical trial entry from the nested JSON structure.
         
         Args:
             trial (Dict): Raw trial data from the API
+            list_columns (bool): Keep conditions, keywords, phases and
+                locations as lists instead of comma-separated strings
             
         Returns:
             Dict: Flattened trial data with simplified structure
         """
         flattened = {}
+        join = list if list_columns else ', '.join
         
         # Extract protocol section for cleaner access
         protocol = trial['protocolSection']
@@ -41,14 +254,14 @@ class ClinicalTrialParser:
         flattened['brief_title'] = identification.get('briefTitle')
         
         # Extract status info
-        status = protocol['statusModule']
+        status = protocol.get('statusModule', {})
         flattened['overall_status'] = status.get('overallStatus')
         flattened['last_known_status'] = status.get('lastKnownStatus')
         flattened['start_date'] = status.get('startDateStruct', {}).get('date')
         flattened['completion_date'] = status.get('completionDateStruct', {}).get('date')
         
         # Extract sponsor info
-        sponsor = protocol['sponsorCollaboratorsModule']
+        sponsor = protocol.get('sponsorCollaboratorsModule', {})
         flattened['sponsor'] = sponsor.get('leadSponsor', {}).get('name')
         
         # Extract study info
@@ -57,139 +270,1327 @@ class ClinicalTrialParser:
         
         # Extract conditions and keywords
         conditions = protocol.get('conditionsModule', {})
-        flattened['conditions'] = ', '.join(conditions.get('conditions', []))
-        flattened['keywords'] = ', '.join(conditions.get('keywords', []))
+        flattened['conditions'] = join(conditions.get('conditions', []))
+        flattened['keywords'] = join(conditions.get('keywords', []))
         
         # Extract enrollment and study design info
         design = protocol.get('designModule', {})
         enrollment_info = design.get('enrollmentInfo', {})
         flattened['enrollment_count'] = enrollment_info.get('count')
         flattened['study_type'] = design.get('studyType')
-        flattened['phase'] = ', '.join(design.get('phases', []))
+        flattened['phase'] = join(design.get('phases', []))
         
         # Extract location info
         locations = protocol.get('contactsLocationsModule', {}).get('locations', [])
-        if locations:
-            flattened['locations'] = ', '.join([
+        if locations or list_columns:
+            flattened['locations'] = join([
                 f"{loc.get('facility', '')} ({loc.get('city', '')}, {loc.get('country', '')})"
                 for loc in locations
             ])
         
         return flattened
 
+
+def _combine_filters(*expressions: Optional[str]) -> str:
+    """
+    Combine Essie expressions with AND, ignoring empty ones.
+    
+    Args:
+        *expressions (Optional[str]): Expressions to combine
+        
+    Returns:
+        str: Combined expression
+    """
+    expressions = [e for e in expressions if e]
+    if len(expressions) == 1:
+        return expressions[0]
+    return ' AND '.join(f'({e})' for e in expressions)
+
+
+def _prefetch(items: Iterator, depth: int) -> Iterator:
+    """
+    Consume an iterator in a background thread, buffering up to depth items.
+    
+    Exceptions raised by the iterator are re-raised in the consuming thread.
+    The producer stops as soon as the consumer goes away.
+    
+    Args:
+        items (Iterator): Iterator to run in the background
+        depth (int): Maximum number of buffered items
+        
+    Yields:
+        Items of the iterator, in order
+    """
+    buffer: queue.Queue = queue.Queue(maxsize=depth)
+    stop = threading.Event()
+    end = object()
+    
+    def put(entry) -> bool:
+        while not stop.is_set():
+            try:
+                buffer.put(entry, timeout=0.1)
+                return True
+            except queue.Full:
+                continue
+        return False
+    
+    def produce() -> None:
+        try:
+            for item in items:
+                if not put((item, None)):
+                    return
+            put((end, None))
+        except BaseException as e:
+            put((end, e))
+    
+    thread = threading.Thread(target=produce, name='pyctrials-prefetch', daemon=True)
+    thread.start()
+    try:
+        while True:
+            item, error = buffer.get()
+            if item is end:
+                if error is not None:
+                    raise error
+                return
+            yield item
+    finally:
+        stop.set()
+
+
+class _TrialAccumulator:
+    """
+    Collect flattened trials across pages and build one DataFrame at the end.
+    
+    Records are de-duplicated on ``nct_id`` with a hash set, keeping the first
+    occurrence, and appended straight into typed column buffers, so the total
+    cost is linear in the number of studies instead of re-merging an
+    ever-growing DataFrame after every page.
+    """
+    
+    def __init__(self,
+                 schema: Optional[Dict[str, str]] = None,
+                 compact: bool = False,
+                 sites: bool = False):
+        self.builder = ColumnBuilder(schema or ClinicalTrialParser().schema())
+        self.compact = compact
+        # Site rows of the collected trials, from their 'sites' entries
+        self.sites = ColumnBuilder(ClinicalTrialParser.SITE_SCHEMA) if sites else None
+        self._seen = set()
+    
+    def __len__(self) -> int:
+        return len(self.builder)
+    
+    def add(self, records: Union[Iterable[Dict], Dict[str, List]]) -> None:
+        """
+        Add flattened records, skipping studies that were already collected.
+        
+        Args:
+            records (Union[Iterable[Dict], Dict[str, List]]): Flattened trial
+                records, or their columns as returned by parse workers
+        """
+        if isinstance(records, dict):
+            self._add_columns(records)
+            return
+        seen = self._seen
+        append = self.builder.append
+        sites = self.sites
+        for record in records:
+            nct_id = record.get('nct_id')
+            if nct_id is not None:
+                if nct_id in seen:
+                    continue
+                seen.add(nct_id)
+            append(record)
+            if sites is not None:
+                sites.extend(record.get('sites') or [])
+    
+    def _add_columns(self, columns: Dict[str, List]) -> None:
+        ids = columns.get('nct_id')
+        if ids is not None:
+            seen = self._seen
+            keep = []
+            for i, nct_id in enumerate(ids):
+                if nct_id is not None:
+                    if nct_id in seen:
+                        continue
+                    seen.add(nct_id)
+                keep.append(i)
+            if len(keep) < len(ids):
+                columns = {name: [values[i] for i in keep] for name, values in columns.items()}
+        self.builder.extend_columns(columns)
+        if self.sites is not None:
+            self.sites.extend(chain.from_iterable(
+                sites for sites in columns.get('sites', []) if sites
+            ))
+    
+    def to_frame(self) -> pd.DataFrame:
+        """
+        Build the final DataFrame from all collected records.
+        
+        Returns:
+            pd.DataFrame: Collected trial data with typed columns
+        """
+        return self.builder.to_frame(self.compact)
+    
+    def sites_frame(self) -> pd.DataFrame:
+        """
+        Build the sites table of the collected trials.
+        
+        Returns:
+            pd.DataFrame: One row per site with the SITE_SCHEMA columns
+        """
+        return self.sites.to_frame()
+
+
+MAX_PAGE_SIZE = 1000
+MIN_PAGE_SIZE = 10
+MAX_PAGE_BYTES = 8 * 1024 * 1024
+
+# Outer bounds of the date ranges used to shard a query
+SHARD_START = date(1900, 1, 1)
+SHARD_END = date(2100, 12, 31)
+
+
+class _Pager:
+    """
+    Pagination state of one query.
+    
+    Tracks the page token, the page size (adaptive when created with
+    ``'auto'``) and the number of trials returned against ``max_results``.
+    An adaptive pager starts at the API maximum and halves the page size when
+    a response exceeds ``MAX_PAGE_BYTES`` or a request times out.
+    """
+    
+    def __init__(self,
+                 params: Dict,
+                 page_size: Union[int, str] = 10,
+                 max_results: Optional[int] = None,
+                 parser_config: Optional[Dict] = None,
+                 sites: bool = False):
+        self.params = params
+        self.adaptive = page_size == 'auto'
+        self.page_size = MAX_PAGE_SIZE if self.adaptive else int(page_size)
+        self.max_results = max_results
+        self.returned = 0
+        self.done = max_results is not None and max_results <= 0
+        # Flatten the site rows of every study along with the trial
+        self.sites = sites
+        self.metrics = QueryMetrics()
+        # Records spooled under one parser configuration cannot be mixed
+        # with records flattened under another, so it is part of the key
+        self.query_key = json.dumps(
+            [params, page_size, max_results, parser_config, sites], sort_keys=True, default=str
+        )
+        self._update_page_size()
+    
+    def state(self) -> Dict:
+        """
+        Capture the position of the pager.
+        
+        Returns:
+            Dict: JSON-serializable state accepted by restore()
+        """
+        return {
+            'page_token': self.params.get('pageToken'),
+            'page_size': self.page_size,
+            'returned': self.returned,
+            'done': self.done,
+        }
+    
+    def restore(self, state: Dict) -> None:
+        """
+        Move the pager back to a position captured by state().
+        
+        Args:
+            state (Dict): Saved pager state
+        """
+        self.params['pageToken'] = state['page_token']
+        self.page_size = state['page_size']
+        self.returned = state['returned']
+        self.done = state['done']
+        self._update_page_size()
+    
+    def _update_page_size(self) -> None:
+        size = self.page_size
+        if self.max_results is not None:
+            # Do not download more than is still needed
+            size = max(1, min(size, self.max_results - self.returned))
+        self.params['pageSize'] = size
+    
+    def back_off(self) -> None:
+        """Halve the page size of an adaptive pager."""
+        if self.adaptive and self.page_size > MIN_PAGE_SIZE:
+            self.page_size = max(MIN_PAGE_SIZE, self.page_size // 2)
+            self._update_page_size()
+    
+    def advance(self,
+                studies: List[Dict],
+                next_page_token: Optional[str],
+                response_bytes: int = 0) -> List[Dict]:
+        """
+        Move past a downloaded page.
+        
+        Args:
+            studies (List[Dict]): Raw studies of the page
+            next_page_token (Optional[str]): Token of the next page
+            response_bytes (int): Size of the response body
+            
+        Returns:
+            List[Dict]: The studies to keep, trimmed to ``max_results``
+        """
+        if self.max_results is not None:
+            studies = studies[:self.max_results - self.returned]
+        self.advance_count(len(studies), next_page_token, response_bytes)
+        return studies
+    
+    def advance_count(self,
+                      count: int,
+                      next_page_token: Optional[str],
+                      response_bytes: int = 0) -> None:
+        """
+        Move past a downloaded page that was not decoded.
+        
+        Args:
+            count (int): Number of studies kept from the page
+            next_page_token (Optional[str]): Token of the next page
+            response_bytes (int): Size of the response body
+        """
+        self.returned += count
+        
+        limit_reached = self.max_results is not None and self.returned >= self.max_results
+        if not next_page_token or limit_reached:
+            self.done = True
+            return
+        
+        if response_bytes > MAX_PAGE_BYTES:
+            self.back_off()
+        self.params['pageToken'] = next_page_token
+        self._update_page_size()
+
+
 class ClinicalTrialsAPI:
     """Client for interacting with the ClinicalTrials.gov API."""
     
     BASE_URL = 'https://clinicaltrials.gov/api/v2/studies'
     VERSION_URL = 'https://clinicaltrials.gov/api/v2/version'
     
-    def __init__(self, max_retries: int = 5, retry_delay: int = 5):
+    def __init__(self,
+                 max_retries: int = 5,
+                 retry_delay: float = 5,
+                 pool_connections: int = 10,
+                 pool_maxsize: int = 10,
+                 keep_alive: bool = True,
+                 adapter_retries: Union[int, Retry] = 0,
+                 session: Optional[requests.Session] = None,
+                 json_decoder: Optional[Callable[[Union[bytes, str]], Any]] = None,
+                 cache: Union[None, bool, str, ResponseCache] = None,
+                 version_check_interval: Optional[float] = 3600,
+                 parse_workers: int = 0,
+                 parse_chunk_size: int = 250,
+                 compact: bool = False,
+                 list_columns: bool = False,
+                 retry_policy: Optional[RetryPolicy] = None,
+                 rate_limit: Union[None, float, RateLimiter] = None,
+                 circuit_breaker: Union[None, bool, CircuitBreaker] = None,
+                 hedge_percentile: Optional[float] = None,
+                 hooks: Optional[Iterable[Hook]] = None,
+                 metrics: Union[None, bool, MetricsRegistry] = None):
         """
         Initialize the API client.
         
         Args:
-            max_retries (int): Maximum number of retry attempts for failed requests
-            retry_delay (int): Delay between retry attempts in seconds
+            max_retries (int): Maximum number of attempts for failed requests
+            retry_delay (float): Longest backoff between retry attempts in
+                seconds; waits grow exponentially with jitter up to this
+                bound. A server's Retry-After is honored beyond it
+            pool_connections (int): Number of host connection pools to cache
+            pool_maxsize (int): Maximum connections kept open per host; set it
+                to at least the number of threads sharing the client
+            keep_alive (bool): Reuse connections across requests
+            adapter_retries (Union[int, Retry]): Low-level retries performed by
+                the transport adapter (connection errors, resets)
+            session (Optional[requests.Session]): Existing session to use
+                instead of creating one
+            json_decoder (Optional[Callable]): Function decoding a JSON
+                payload from bytes; defaults to the fastest installed backend
+                (orjson, msgspec, then the standard library)
+            cache (Union[None, bool, str, ResponseCache]): On-disk response
+                cache; True uses the default directory, a string is taken as
+                the cache directory
+            version_check_interval (Optional[float]): Seconds between checks
+                of the registry data version while the cache is used; cached
+                responses from an older data version are discarded. None
+                disables the automatic check
+            parse_workers (int): Number of worker processes that decode and
+                flatten large pages from the raw response while the next
+                pages download; 0 or 1 parses in the calling process. The
+                workers decode with json_decoder, which must then be picklable
+                (a module-level function, not a lambda)
+            parse_chunk_size (int): Pages requesting at most this many
+                studies are parsed in-process
+            compact (bool): Return memory-efficient frames: categoricals for
+                the status, sponsor, study type and phase columns, Int32
+                counts and Arrow-backed strings for free text
+            list_columns (bool): Return conditions, keywords, phases and
+                locations as list columns instead of comma-separated strings
+            retry_policy (Optional[RetryPolicy]): Error classification,
+                backoff and retry budget shared by every request of the
+                client; built from max_retries and retry_delay by default
+            rate_limit (Union[None, float, RateLimiter]): Client-side limit on
+                network requests; a number of requests per second is shared
+                by every client of the process using the same rate, and a
+                FileRateLimiter also coordinates other processes
+            circuit_breaker (Union[None, bool, CircuitBreaker]): Fail fast
+                with CircuitOpenError while the upstream error rate is high;
+                True uses the default thresholds
+            hedge_percentile (Optional[float]): Send a duplicate of requests
+                still running after this percentile of recent latencies
+                (e.g. 95) and use whichever answers first; None disables it
+            hooks (Optional[Iterable[Hook]]): Callables receiving every
+                instrumentation event as hook(event, data); see add_hook
+            metrics (Union[None, bool, MetricsRegistry]): Registry recording
+                request counters, latency histograms, cache hits and parse
+                totals; True uses the process-wide pyctrials.metrics.REGISTRY
         """
         self.max_retries = max_retries
         self.retry_delay = retry_delay
-        self.parser = ClinicalTrialParser()
+        self.retry_policy = retry_policy or RetryPolicy(
+            max_retries=max_retries, max_delay=retry_delay
+        )
+        if rate_limit is not None and not isinstance(rate_limit, RateLimiter):
+            rate_limit = RateLimiter.shared(rate_limit)
+        self.rate_limiter: Optional[RateLimiter] = rate_limit
+        if circuit_breaker is True:
+            circuit_breaker = CircuitBreaker()
+        self.circuit_breaker: Optional[CircuitBreaker] = circuit_breaker or None
+        self.hedger: Optional[Hedger] = None
+        if hedge_percentile is not None:
+            self.hedger = Hedger(hedge_percentile, max_workers=pool_maxsize)
+        self.hooks: List[Hook] = list(hooks or [])
+        if metrics is True:
+            metrics = REGISTRY
+        self.metrics: Optional[MetricsRegistry] = metrics or None
+        if self.metrics is not None:
+            self.hooks.append(self.metrics)
+            self.metrics.track(self)
+        self.parser = ClinicalTrialParser(list_columns=list_columns)
+        self.json_decoder = json_decoder or json_loads
+        if parse_workers > 1:
+            try:
+                pickle.dumps(self.json_decoder)
+            except (pickle.PicklingError, AttributeError, TypeError) as e:
+                raise ValueError(
+                    "json_decoder must be picklable (a module-level function) "
+                    "to be used by parse workers"
+                ) from e
+        if cache is True:
+            cache = ResponseCache()
+        elif isinstance(cache, (str, os.PathLike)):
+            cache = ResponseCache(os.fspath(cache))
+        self.cache: Optional[ResponseCache] = cache or None
+        self.version_check_interval = version_check_interval
+        self._version_checked: Optional[float] = None
+        self._version_lock = threading.Lock()
+        self.parse_workers = parse_workers
+        self.parse_chunk_size = parse_chunk_size
+        self._parse_pool: Optional[ProcessPoolExecutor] = None
+        self._parse_pool_lock = threading.Lock()
+        self.compact = compact
+        self.session = session or self._build_session(
+            pool_connections, pool_maxsize, keep_alive, adapter_retries
+        )
+    
+    @staticmethod
+    def _build_session(pool_connections: int,
+                       pool_maxsize: int,
+                       keep_alive: bool,
+                       adapter_retries: Union[int, Retry]) -> requests.Session:
+        """
+        Create a session backed by a pooled, keep-alive transport adapter.
+        
+        The underlying urllib3 pool is thread-safe, so one session can be
+        shared by every page, query and thread of the client.
+        
+        Args:
+            pool_connections (int): Number of host connection pools to cache
+            pool_maxsize (int): Maximum connections kept open per host
+            keep_alive (bool): Reuse connections across requests
+            adapter_retries (Union[int, Retry]): Transport-level retries
+            
+        Returns:
+            requests.Session: Configured session
+        """
+        session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            max_retries=adapter_retries
+        )
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        if not keep_alive:
+            session.headers['Connection'] = 'close'
+        return session
+    
+    def close(self) -> None:
+        """Close the session and shut down the parsing worker processes."""
+        self.session.close()
+        if self.hedger is not None:
+            self.hedger.close()
+        if self._parse_pool is not None:
+            self._parse_pool.shutdown()
+            self._parse_pool = None
+    
+    def __enter__(self) -> 'ClinicalTrialsAPI':
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+    
+    def stats(self) -> Dict:
+        """
+        Report the activity of the retry policy, circuit breaker and hedging.
+        
+        Returns:
+            Dict: Counters prefixed with 'retry_', 'circuit_' and 'hedge_',
+            and the current circuit state
+        """
+        stats = {f'retry_{name}': count for name, count in self.retry_policy.counts().items()}
+        if self.circuit_breaker is not None:
+            stats['circuit_state'] = self.circuit_breaker.state
+            stats.update(
+                (f'circuit_{name}', count) for name, count in self.circuit_breaker.counts().items()
+            )
+        if self.hedger is not None:
+            counts = self.hedger.counts()
+            stats['hedge_requests'] = counts.get('hedged', 0)
+            stats['hedge_wins'] = counts.get('hedge_wins', 0)
+        return stats
+    
+    def add_hook(self, hook: Hook) -> None:
+        """
+        Register a callable receiving every instrumentation event.
+        
+        Hooks are called as hook(event, data), from the thread doing the
+        work, for the events 'request', 'retry', 'decode', 'flatten',
+        'accumulate', 'dates' and 'build' (see pyctrials.instrument).
+        
+        Args:
+            hook (Hook): Callable taking the event name and its data
+        """
+        self.hooks.append(hook)
+    
+    def _emit(self,
+              event: str,
+              data: Dict,
+              metrics: Optional[QueryMetrics] = None) -> None:
+        """Pass an event to the hooks and add it to a query's totals."""
+        if metrics is not None:
+            metrics.add(event, data)
+        for hook in self.hooks:
+            hook(event, data)
     
     def get_version(self) -> Dict:
         """
         Get the API version information.
         
+        The version is always fetched from the API. Its data timestamp is
+        recorded in the response cache, which drops entries downloaded under
+        an older version of the registry data.
+        
         Returns:
             Dict: API version details
         """
-        response = requests.get(self.VERSION_URL)
-        response.raise_for_status()
-        return response.json()
+        version = self.retry_policy.call(
+            lambda: self.json_decoder(self._get(self.VERSION_URL, use_cache=False))
+        )
+        data_version = version.get('dataTimestamp')
+        if self.cache is not None and data_version:
+            self.cache.set_data_version(data_version)
+        return version
+    
+    def _check_data_version(self) -> None:
+        """Refresh the cache's data version if the last check is too old."""
+        if self.version_check_interval is None:
+            return
+        now = time.monotonic()
+        with self._version_lock:
+            last_check = self._version_checked
+            if last_check is not None and now - last_check < self.version_check_interval:
+                return
+            self._version_checked = now
+        try:
+            self.get_version()
+        except RequestException as e:
+            # Keep serving cached data when the version endpoint is unreachable
+            logger.warning("Data version check failed: %s", e)
+    
+    def _get(self,
+             url: str,
+             params: Optional[Dict] = None,
+             use_cache: bool = True,
+             metrics: Optional[QueryMetrics] = None) -> bytes:
+        """
+        Perform a GET request, going through the response cache if enabled.
+        
+        Args:
+            url (str): Endpoint URL
+            params (Optional[Dict]): Query parameters
+            use_cache (bool): Whether the response cache may be used
+            metrics (Optional[QueryMetrics]): Totals of the query the request
+                belongs to
+            
+        Returns:
+            bytes: Response body
+        """
+        attempt = self.retry_policy.attempt
+        cache = self.cache if use_cache else None
+        if cache is not None:
+            self._check_data_version()
+            start = time.perf_counter()
+            content = cache.get(url, params)
+            if content is not None:
+                self._emit('request', {
+                    'url': url, 'status': 200, 'bytes': len(content), 'attempt': attempt,
+                    'cache_hit': True, 'seconds': time.perf_counter() - start,
+                }, metrics)
+                return content
+        
+        throttle = {}
+        
+        def send() -> bytes:
+            # Only the first copy of a hedged request reports the limiter wait
+            event = {'url': url, 'status': None, 'bytes': 0, 'attempt': attempt,
+                     'cache_hit': False, 'throttle_seconds': throttle.pop('seconds', 0.0)}
+            sent = time.perf_counter()
+            try:
+                response = self.session.get(url, params=params, timeout=10)
+                received = time.perf_counter()
+                event['status'] = response.status_code
+                event['bytes'] = len(response.content)
+                event['wait_seconds'] = response.elapsed.total_seconds()
+                event['transfer_seconds'] = max(0.0, received - sent - event['wait_seconds'])
+                response.raise_for_status()
+                return response.content
+            except RequestException as e:
+                event['error'] = repr(e)
+                raise
+            finally:
+                event['seconds'] = time.perf_counter() - sent
+                self._emit('request', event, metrics)
+        
+        def acquire() -> None:
+            throttle['seconds'] = self.rate_limiter.acquire()
+        
+        def request() -> bytes:
+            # Every copy sent takes a token, before the hedger starts timing
+            # it, so limiter waits do not count as latency
+            take_token = acquire if self.rate_limiter is not None else None
+            if take_token is not None:
+                take_token()
+            if self.hedger is not None:
+                return self.hedger.call(send, take_token)
+            return send()
+        
+        if self.circuit_breaker is not None:
+            content = self.circuit_breaker.call(request)
+        else:
+            content = request()
+        if cache is not None:
+            cache.set(url, params, content)
+        return content
     
     def fetch_trials(self, 
                     condition: str,
                     status: str = 'RECRUITING',
-                    page_size: int = 10) -> pd.DataFrame:
+                    page_size: Union[int, str] = 10,
+                    max_results: Optional[int] = None,
+                    fields: Optional[Union[str, Iterable[str]]] = None,
+                    advanced_filter: Optional[str] = None,
+                    checkpoint_dir: Optional[str] = None,
+                    prefetch: int = 0,
+                    sites: bool = False) -> Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]:
         """
         Fetch clinical trials for a specific condition.
         
         Args:
             condition (str): Medical condition to search for
             status (str): Trial status filter (e.g., 'RECRUITING')
-            page_size (int): Number of results per page
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+                to start at the API maximum and shrink pages that are too
+                large or time out
+            max_results (Optional[int]): Stop after this many trials
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts, and
+                'all' downloads complete study documents
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            checkpoint_dir (Optional[str]): Directory in which every fetched
+                page and the next page token are saved. Calling again with
+                the same query resumes after the last saved page; the saved
+                pages are removed once the query completes
+            prefetch (int): Number of pages downloaded ahead by a background
+                thread while the current page is parsed (0 disables it)
+            sites (bool): Also build the sites table of the trials (as
+                fetch_sites does) from the same pages, without a second crawl
+            
+        Returns:
+            Union[pd.DataFrame, Tuple[pd.DataFrame, pd.DataFrame]]: DataFrame
+            containing all fetched trials, with the query's instrumentation
+            totals in ``attrs['metrics']``; with sites=True, a tuple of the
+            trials and their sites
+        """
+        started = time.perf_counter()
+        pager = self._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter, sites
+        )
+        accumulator = _TrialAccumulator(self.parser.schema(), self.compact, sites)
+        if checkpoint_dir is None:
+            for records in self._iter_records(pager, prefetch):
+                self._accumulate(accumulator, records, pager.metrics)
+            trials = self._finish_frame(accumulator, pager.metrics, started)
+            return (trials, accumulator.sites_frame()) if sites else trials
+        
+        # Resume from the pages spooled by an earlier, interrupted call
+        spool = PageSpool(checkpoint_dir, pager.query_key)
+        for records in spool.resume(pager):
+            self._accumulate(accumulator, records, pager.metrics)
+        for records, state in self._iter_records_with_state(pager, prefetch):
+            self._accumulate(accumulator, records, pager.metrics)
+            spool.append(records, state)
+        
+        trials = self._finish_frame(accumulator, pager.metrics, started)
+        spool.remove()
+        return (trials, accumulator.sites_frame()) if sites else trials
+    
+    def sync(self,
+             query: Union[str, Dict],
+             store: Union[str, TrialStore],
+             page_size: Union[int, str] = 'auto') -> pd.DataFrame:
+        """
+        Bring a local copy of a query's trials up to date.
+        
+        The first run fetches the whole query. Later runs only fetch the
+        studies whose LastUpdatePostDate is on or after the previous sync
+        date and upsert them into the store by nct_id. Trials that stop
+        matching the query (e.g. after a status change) are not removed.
+        
+        Args:
+            query (Union[str, Dict]): Condition to search for, or keyword
+                arguments of fetch_trials (condition, status, fields,
+                advanced_filter)
+            store (Union[str, TrialStore]): Store, or its directory
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            
+        Returns:
+            pd.DataFrame: All trials of the query after the update
+        """
+        if isinstance(query, str):
+            query = {'condition': query}
+        if not isinstance(store, TrialStore):
+            store = TrialStore(store)
+        
+        query_key = json.dumps(query, sort_keys=True, default=str)
+        # Updates are posted by day, so the sync point is a date. Re-reading
+        # the day of the last sync catches studies updated later that day.
+        started = datetime.now(timezone.utc).date().isoformat()
+        since = store.last_sync(query_key)
+        
+        params = dict(query, page_size=page_size)
+        if since is None:
+            trials = self.fetch_trials(**params)
+        else:
+            params['advanced_filter'] = _combine_filters(
+                params.get('advanced_filter'),
+                f'AREA[LastUpdatePostDate]RANGE[{since},MAX]'
+            )
+            trials = store.upsert(store.load(), self.fetch_trials(**params))
+        
+        store.save(trials, query_key, started)
+        return trials
+    
+    def count_trials(self,
+                     condition: str,
+                     status: str = 'RECRUITING',
+                     advanced_filter: Optional[str] = None) -> int:
+        """
+        Count the trials matching a query without downloading them.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            
+        Returns:
+            int: Number of matching trials
+        """
+        params = self._build_params(
+            condition, status, [ClinicalTrialParser.FIELDS['nct_id']], advanced_filter
+        )
+        params.update({'pageSize': 1, 'countTotal': 'true'})
+        data = self.retry_policy.call(
+            lambda: self.json_decoder(self._get(self.BASE_URL, params))
+        )
+        return int(data.get('totalCount', 0))
+    
+    def fetch_trials_sharded(self,
+                             condition: str,
+                             status: str = 'RECRUITING',
+                             shard_field: str = 'StartDate',
+                             shard_size: int = 5000,
+                             max_workers: int = 4,
+                             page_size: Union[int, str] = 'auto',
+                             fields: Optional[Union[str, Iterable[str]]] = None,
+                             advanced_filter: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch a large query as date-range shards crawled concurrently.
+        
+        Pagination is strictly serial, so the query is split into disjoint
+        ranges of a date field, sized with count-only requests so that each
+        holds at most shard_size trials (plus one shard for studies without
+        the date). The shards are paginated concurrently over the shared
+        connection pool and merged, de-duplicated by nct_id.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            shard_field (str): Date search area to split on (e.g.,
+                'StartDate' or 'LastUpdatePostDate')
+            shard_size (int): Target maximum number of trials per shard
+            max_workers (int): Number of shards fetched at the same time;
+                keep it at or below the client's pool_maxsize
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts
+            advanced_filter (Optional[str]): Essie expression restricting the
+                whole query
             
         Returns:
             pd.DataFrame: DataFrame containing all fetched trials
         """
+        def shard_filter(shard: Tuple[Optional[date], Optional[date]]) -> str:
+            low, high = shard
+            if low is None:
+                expression = f'AREA[{shard_field}]MISSING'
+            else:
+                start = low.isoformat() if low > SHARD_START else 'MIN'
+                end = high.isoformat() if high < SHARD_END else 'MAX'
+                expression = f'AREA[{shard_field}]RANGE[{start},{end}]'
+            return _combine_filters(advanced_filter, expression)
+        
+        def count(shard) -> int:
+            return self.count_trials(condition, status, shard_filter(shard))
+        
+        def fetch(shard) -> Tuple[List[List[Dict]], QueryMetrics]:
+            pager = self._make_pager(
+                condition, status, page_size, None, fields, shard_filter(shard)
+            )
+            return list(self._iter_records(pager)), pager.metrics
+        
+        started = time.perf_counter()
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            # Bisect date ranges level by level until every shard is small enough
+            shards = [(None, None)]
+            pending = [(SHARD_START, SHARD_END)]
+            while pending:
+                counts = executor.map(count, pending)
+                next_pending = []
+                for (low, high), n in zip(pending, counts):
+                    if n == 0:
+                        continue
+                    if n <= shard_size or low == high:
+                        shards.append((low, high))
+                    else:
+                        middle = low + (high - low) // 2
+                        next_pending.append((low, middle))
+                        next_pending.append((middle + timedelta(days=1), high))
+                pending = next_pending
+            
+            accumulator = _TrialAccumulator(self.parser.schema(), self.compact)
+            metrics = QueryMetrics()
+            for pages, shard_metrics in executor.map(fetch, shards):
+                metrics.merge(shard_metrics)
+                for records in pages:
+                    self._accumulate(accumulator, records, metrics)
+        return self._finish_frame(accumulator, metrics, started)
+    
+    def iter_pages(self,
+                   condition: str,
+                   status: str = 'RECRUITING',
+                   page_size: Union[int, str] = 10,
+                   max_results: Optional[int] = None,
+                   fields: Optional[Union[str, Iterable[str]]] = None,
+                   advanced_filter: Optional[str] = None,
+                   prefetch: int = 0) -> Iterator[pd.DataFrame]:
+        """
+        Iterate over the pages of a query as they are downloaded.
+        
+        Only the current page is held in memory, so arbitrarily large result
+        sets can be streamed into a sink page by page.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+                to start at the API maximum and shrink pages that are too
+                large or time out
+            max_results (Optional[int]): Stop after this many trials
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts, and
+                'all' downloads complete study documents
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            prefetch (int): Number of pages downloaded ahead by a background
+                thread while the current page is processed (0 disables it)
+            
+        Yields:
+            pd.DataFrame: Trials of one page
+        """
+        pager = self._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter
+        )
+        for records in self._iter_records(pager, prefetch):
+            yield self._records_to_frame(records)
+    
+    def iter_trials(self,
+                    condition: str,
+                    status: str = 'RECRUITING',
+                    page_size: Union[int, str] = 10,
+                    max_results: Optional[int] = None,
+                    fields: Optional[Union[str, Iterable[str]]] = None,
+                    advanced_filter: Optional[str] = None,
+                    prefetch: int = 0) -> Iterator[Dict]:
+        """
+        Iterate over the flattened trials of a query one by one.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+                to start at the API maximum and shrink pages that are too
+                large or time out
+            max_results (Optional[int]): Stop after this many trials
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; defaults to the fields the parser extracts, and
+                'all' downloads complete study documents
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            prefetch (int): Number of pages downloaded ahead by a background
+                thread while the current page is processed (0 disables it)
+            
+        Yields:
+            Dict: Flattened trial data, with dates left as returned by the API
+        """
+        pager = self._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter
+        )
+        for records in self._iter_records(pager, prefetch):
+            if isinstance(records, dict):
+                from .parallel import columns_to_records
+                records = columns_to_records(records)
+            yield from records
+    
+    def fetch_sites(self,
+                    condition: str,
+                    status: str = 'RECRUITING',
+                    page_size: Union[int, str] = 'auto',
+                    max_results: Optional[int] = None,
+                    advanced_filter: Optional[str] = None) -> pd.DataFrame:
+        """
+        Fetch the sites (locations) of a query as a normalized table.
+        
+        Only the NCT ID and the locations of each study are downloaded.
+        Country and city are interned into integer-coded categoricals, so
+        site and country aggregations are groupbys over small integers.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter (e.g., 'RECRUITING')
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            max_results (Optional[int]): Stop after this many trials
+            advanced_filter (Optional[str]): Essie expression passed as the
+                API 'filter.advanced' parameter
+            
+        Returns:
+            pd.DataFrame: One row per site with the columns nct_id, facility,
+            city, state, country, status, latitude and longitude
+        """
+        fields = [ClinicalTrialParser.FIELDS['nct_id'], ClinicalTrialParser.FIELDS['locations']]
+        pager = self._make_pager(
+            condition, status, page_size, max_results, fields, advanced_filter
+        )
+        builder = ColumnBuilder(ClinicalTrialParser.SITE_SCHEMA)
+        seen = set()
+        while not pager.done:
+            for study in self._download_page(pager):
+                sites = ClinicalTrialParser.flatten_sites(study)
+                if sites and sites[0]['nct_id'] is not None:
+                    if sites[0]['nct_id'] in seen:
+                        continue
+                    seen.add(sites[0]['nct_id'])
+                builder.extend(sites)
+        return builder.to_frame()
+    
+    def _iter_records(self,
+                      pager: '_Pager',
+                      prefetch: int = 0) -> Iterator[Page]:
+        """
+        Follow the pagination of a query, yielding each page's records.
+        
+        Args:
+            pager (_Pager): Pagination state of the query
+            prefetch (int): Number of pages downloaded ahead in the background
+            
+        Yields:
+            Page: Flattened studies of one page, as records or as columns
+        """
+        for records, _ in self._iter_records_with_state(pager, prefetch):
+            yield records
+    
+    def _iter_records_with_state(self,
+                                 pager: '_Pager',
+                                 prefetch: int = 0) -> Iterator[Tuple[Page, Dict]]:
+        """
+        Follow the pagination of a query, optionally pipelined.
+        
+        With prefetch > 0 a background thread downloads and decodes the next
+        pages as soon as their tokens are known, while the caller's thread
+        flattens the current one. The queue between them holds at most
+        prefetch pages, which bounds memory when the consumer is slower.
+        
+        Pages handed to parse workers are sent undecoded, and up to
+        parse_workers of them are parsed while the next ones download.
+        
+        Args:
+            pager (_Pager): Pagination state of the query
+            prefetch (int): Number of pages downloaded ahead in the background
+            
+        Yields:
+            Tuple[Page, Dict]: Flattened studies of one page and the pager
+            state right after that page
+        """
+        def download() -> Iterator[Tuple[Union[List[Dict], Future], Dict]]:
+            while not pager.done:
+                if self._parses_in_workers(pager):
+                    page = self._submit_page(pager)
+                else:
+                    page = self._download_page(pager)
+                yield page, pager.state()
+        
+        def finish(page: Union[List[Dict], Future]) -> Page:
+            if isinstance(page, Future):
+                return self._collect_page(page, pager.metrics)
+            return self._flatten_studies(page, pager.metrics, pager.sites)
+        
+        pages = _prefetch(download(), prefetch) if prefetch > 0 else download()
+        in_flight = deque()
+        for page, state in pages:
+            in_flight.append((page, state))
+            if len(in_flight) >= max(1, self.parse_workers):
+                page, state = in_flight.popleft()
+                yield finish(page), state
+        while in_flight:
+            page, state = in_flight.popleft()
+            yield finish(page), state
+    
+    def _accumulate(self,
+                    accumulator: '_TrialAccumulator',
+                    records: Page,
+                    metrics: QueryMetrics) -> None:
+        """Add a page of flattened studies to a query's result, timing it."""
+        start = time.perf_counter()
+        accumulator.add(records)
+        self._emit('accumulate', {
+            'seconds': time.perf_counter() - start, 'studies': _page_length(records)
+        }, metrics)
+    
+    def _finish_frame(self,
+                      accumulator: '_TrialAccumulator',
+                      metrics: QueryMetrics,
+                      started: float) -> pd.DataFrame:
+        """
+        Build a query's DataFrame and attach its instrumentation totals.
+        
+        Args:
+            accumulator (_TrialAccumulator): Collected trials of the query
+            metrics (QueryMetrics): Totals of the query's events
+            started (float): perf_counter() value when the query started
+            
+        Returns:
+            pd.DataFrame: Trials, with the totals in ``attrs['metrics']``
+        """
+        start = time.perf_counter()
+        trials = accumulator.to_frame()
+        dates = accumulator.builder.timings.get('dates', 0.0)
+        rows = len(trials)
+        self._emit('dates', {'seconds': dates, 'rows': rows}, metrics)
+        self._emit('build', {
+            'seconds': time.perf_counter() - start - dates, 'rows': rows
+        }, metrics)
+        
+        totals = metrics.to_dict()
+        totals['rows'] = rows
+        totals['wall_seconds'] = time.perf_counter() - started
+        trials.attrs['metrics'] = totals
+        return trials
+    
+    def _make_pager(self,
+                    condition: str,
+                    status: str,
+                    page_size: Union[int, str] = 10,
+                    max_results: Optional[int] = None,
+                    fields: Optional[Union[str, Iterable[str]]] = None,
+                    advanced_filter: Optional[str] = None,
+                    sites: bool = False) -> '_Pager':
+        """
+        Create the pagination state of a query.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter
+            page_size (Union[int, str]): Number of results per page, or 'auto'
+            max_results (Optional[int]): Stop after this many trials
+            fields (Optional[Union[str, Iterable[str]]]): API fields to download
+            advanced_filter (Optional[str]): Essie expression for 'filter.advanced'
+            sites (bool): Flatten the site rows of every study too
+            
+        Returns:
+            _Pager: Pager positioned on the first page
+        """
+        params = self._build_params(condition, status, fields, advanced_filter)
+        return _Pager(params, page_size, max_results, self.parser.config(), sites)
+    
+    def _build_params(self,
+                      condition: str,
+                      status: str,
+                      fields: Optional[Union[str, Iterable[str]]] = None,
+                      advanced_filter: Optional[str] = None) -> Dict:
+        """
+        Build the query parameters for the studies endpoint.
+        
+        Args:
+            condition (str): Medical condition to search for
+            status (str): Trial status filter
+            fields (Optional[Union[str, Iterable[str]]]): API fields to
+                download; None projects onto the parser's fields and 'all'
+                disables the projection
+            advanced_filter (Optional[str]): Essie expression for 'filter.advanced'
+            
+        Returns:
+            Dict: Query parameters for the first page
+        """
         params = {
             'query.cond': condition,
-            'pageSize': page_size,
             'format': 'json',
             'filter.overallStatus': status,
             'pageToken': None
         }
+        if fields is None:
+            fields = self.parser.fields()
+        if isinstance(fields, str):
+            if fields.lower() != 'all':
+                params['fields'] = fields
+        else:
+            params['fields'] = ','.join(fields)
+        if advanced_filter:
+            params['filter.advanced'] = advanced_filter
+        return params
+    
+    def _fetch_page(self, pager: '_Pager') -> Page:
+        """
+        Fetch and flatten the next page of a query, retrying failed requests.
         
-        all_trials = pd.DataFrame()
-        page = 0
+        Args:
+            pager (_Pager): Pagination state of the query, advanced in place
+            
+        Returns:
+            Page: Flattened studies of the page, as columns when parsed by a
+            worker process
+        """
+        if self._parses_in_workers(pager):
+            return self._collect_page(self._submit_page(pager), pager.metrics)
+        return self._flatten_studies(self._download_page(pager), pager.metrics, pager.sites)
+    
+    def _parses_in_workers(self, pager: '_Pager') -> bool:
+        """Tell whether the next page of a query is parsed by worker processes."""
+        return self.parse_workers > 1 and pager.params['pageSize'] > self.parse_chunk_size
+    
+    def _download_page(self, pager: '_Pager') -> List[Dict]:
+        """
+        Download and decode the next page of a query, retrying failed requests.
         
-        while True:
-            for attempt in range(self.max_retries):
-                try:
-                    response = requests.get(
-                        self.BASE_URL,
-                        params=params,
-                        timeout=10
-                    )
-                    response.raise_for_status()
-                    
-                    # Process the current page
-                    current_trials = self._process_response(response.text)
-                    
-                    # Merge with existing results
-                    if page == 0:
-                        all_trials = current_trials
-                    else:
-                        all_trials = self._merge_trials(all_trials, current_trials)
-                    
-                    # Check for next page
-                    next_page_token = response.json().get('nextPageToken')
-                    if not next_page_token:
-                        return all_trials
-                    
-                    params['pageToken'] = next_page_token
-                    page += 1
-                    break
-                    
-                except RequestException as e:
-                    print(f"Attempt {attempt + 1} failed: {e}")
-                    if attempt == self.max_retries - 1:
-                        raise
-                    time.sleep(self.retry_delay)
-    
-    def _process_response(self, response_text: str) -> pd.DataFrame:
+        Args:
+            pager (_Pager): Pagination state of the query, advanced in place
+            
+        Returns:
+            List[Dict]: Raw studies of the page, trimmed to max_results
+        """
+        def download() -> List[Dict]:
+            content = self._get(self.BASE_URL, pager.params, metrics=pager.metrics)
+            
+            # Decode the page once, straight from the response bytes
+            start = time.perf_counter()
+            data = self.json_decoder(content)
+            self._emit('decode', {
+                'seconds': time.perf_counter() - start, 'bytes': len(content)
+            }, pager.metrics)
+            return pager.advance(
+                data.get('studies', []),
+                data.get('nextPageToken'),
+                len(content)
+            )
+        
+        def on_retry(attempt: int, error: Exception) -> None:
+            self._emit('retry', {'attempt': attempt + 1, 'error': repr(error)}, pager.metrics)
+            # A timed-out page is probably too large; ask for a smaller one
+            if isinstance(error, Timeout):
+                pager.back_off()
+        
+        return self.retry_policy.call(download, on_retry)
+    
+    def _download_raw_page(self, pager: '_Pager') -> Tuple[bytes, int]:
+        """
+        Download the next page of a query without decoding it.
+        
+        Only the next page token is read from the response, so that the
+        pager can move on while a worker decodes the page.
+        
+        Args:
+            pager (_Pager): Pagination state of the query, advanced in place
+            
+        Returns:
+            Tuple[bytes, int]: Response body, and the number of its studies
+            to keep (the page size, trimmed to max_results)
+        """
+        def download() -> Tuple[bytes, int]:
+            content = self._get(self.BASE_URL, pager.params, metrics=pager.metrics)
+            limit = pager.params['pageSize']
+            match = NEXT_PAGE_TOKEN.search(content)
+            token = json.loads(b'"' + match.group(1) + b'"') if match else None
+            pager.advance_count(limit, token, len(content))
+            return content, limit
+        
+        def on_retry(attempt: int, error: Exception) -> None:
+            self._emit('retry', {'attempt': attempt + 1, 'error': repr(error)}, pager.metrics)
+            if isinstance(error, Timeout):
+                pager.back_off()
+        
+        return self.retry_policy.call(download, on_retry)
+    
+    def _submit_page(self, pager: '_Pager') -> Future:
+        """
+        Download the next page of a query and hand it to a parse worker.
+        
+        Args:
+            pager (_Pager): Pagination state of the query, advanced in place
+            
+        Returns:
+            Future: Result of parallel.flatten_page for the page
+        """
+        from .parallel import flatten_page
+        content, limit = self._download_raw_page(pager)
+        return self._get_parse_pool().submit(
+            flatten_page, self.parser, content, limit, pager.sites, self.json_decoder
+        )
+    
+    def _collect_page(self,
+                      future: Future,
+                      metrics: Optional[QueryMetrics] = None) -> Dict[str, List]:
+        """
+        Wait for a page parsed by a worker and report the worker's timings.
+        
+        Args:
+            future (Future): Pending result of parallel.flatten_page
+            metrics (Optional[QueryMetrics]): Totals of the query the page
+                belongs to
+            
+        Returns:
+            Dict[str, List]: Flattened studies of the page, by column
+        """
+        columns, events = future.result()
+        for event, data in events.items():
+            self._emit(event, data, metrics)
+        return columns
+    
+    def _flatten_response(self, response_text: Union[bytes, str]) -> List[Dict]:
+        """
+        Flatten every study contained in an API response.
+        
+        Args:
+            response_text (Union[bytes, str]): Raw JSON response from the API
+            
+        Returns:
+            List[Dict]: One flattened record per study
+        """
+        data = self.json_decoder(response_text)
+        return self._flatten_studies(data.get('studies', []))
+    
+    def _flatten_studies(self,
+                         studies: List[Dict],
+                         metrics: Optional[QueryMetrics] = None,
+                         sites: bool = False) -> List[Dict]:
+        """
+        Flatten a list of decoded studies.
+        
+        Args:
+            studies (List[Dict]): Raw study documents
+            metrics (Optional[QueryMetrics]): Totals of the query the studies
+                belong to
+            sites (bool): Add each study's site rows under 'sites'
+            
+        Returns:
+            List[Dict]: One flattened record per study
+        """
+        start = time.perf_counter()
+        flatten = self.parser.flatten
+        records = [flatten(study, sites) for study in studies]
+        self._emit('flatten', {
+            'seconds': time.perf_counter() - start, 'studies': len(studies)
+        }, metrics)
+        return records
+    
+    def _get_parse_pool(self) -> ProcessPoolExecutor:
+        """Create the parsing process pool on first use."""
+        with self._parse_pool_lock:
+            if self._parse_pool is None:
+                # Spawned workers do not inherit the session, its sockets or
+                # the locks of background threads, unlike forked ones
+                self._parse_pool = ProcessPoolExecutor(
+                    max_workers=self.parse_workers,
+                    mp_context=multiprocessing.get_context('spawn')
+                )
+            return self._parse_pool
+    
+    def _process_response(self, response_text: Union[bytes, str]) -> pd.DataFrame:
         """
         Process API response text into a DataFrame.
         
         Args:
-            response_text (str): Raw JSON response from the API
+            response_text (Union[bytes, str]): Raw JSON response from the API
             
         Returns:
             pd.DataFrame: Processed trial data
         """
-        data = json.loads(response_text)
-        studies = data.get('studies', [])
-        flattened_studies = [
-            self.parser.flatten_trial(study) for study in studies
-        ]
-        df = pd.DataFrame(flattened_studies)
-        
-        # Convert date columns
-        date_columns = ['start_date', 'completion_date']
-        for col in date_columns:
-            if col in df.columns:
-                df[col] = pd.to_datetime(df[col], errors='coerce')
+        return self._records_to_frame(self._flatten_response(response_text))
+    
+    def _records_to_frame(self, records: Page) -> pd.DataFrame:
+        """
+        Build a DataFrame with the parser's fixed schema from flattened trials.
         
-        return df
+        Args:
+            records (Page): Flattened trial records, or their columns
+            
+        Returns:
+            pd.DataFrame: Trial data with typed columns
+        """
+        builder = ColumnBuilder(self.parser.schema())
+        if isinstance(records, dict):
+            builder.extend_columns(records)
+        else:
+            builder.extend(records)
+        return builder.to_frame(self.compact)
     
     @staticmethod
     def _merge_trials(df1: pd.DataFrame,
@@ -0,0 +1,158 @@
+"""
+Client-side token-bucket rate limiting of API requests.
+
+Every network request takes one token from a bucket that refills at a
+fixed rate up to a burst size. A caller that finds the bucket empty
+reserves the next token and sleeps until it is due, so concurrent callers
+are served in arrival order and aggregate throughput stays at the rate
+instead of overshooting it and backing off on 429s.
+
+Limiters obtained with ``RateLimiter.shared`` are shared by every client of
+the process. ``FileRateLimiter`` keeps the bucket in a small file locked
+with ``fcntl``, which coordinates all processes of the machine.
+"""
+
+import os
+import threading
+import time
+from typing import Dict, Optional, Tuple
+
+
+class RateLimiter:
+    """Thread-safe token bucket shared by the clients of one process."""
+    
+    _shared: Dict[Tuple, 'RateLimiter'] = {}
+    _shared_lock = threading.Lock()
+    
+    def __init__(self, rate: float, burst: Optional[float] = None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            rate (float): Sustained number of requests per second
+            burst (Optional[float]): Number of requests that may be sent at
+                once after an idle period (defaults to one second's worth,
+                and at least 1)
+        """
+        if rate <= 0:
+            raise ValueError("rate must be positive")
+        self.rate = float(rate)
+        self.burst = float(burst if burst is not None else max(1.0, rate))
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    @classmethod
+    def shared(cls,
+               rate: float,
+               burst: Optional[float] = None,
+               path: Optional[str] = None) -> 'RateLimiter':
+        """
+        Get the process-wide limiter for a rate, creating it on first use.
+        
+        Args:
+            rate (float): Sustained number of requests per second
+            burst (Optional[float]): Maximum burst size
+            path (Optional[str]): State file coordinating several processes;
+                None limits this process only
+            
+        Returns:
+            RateLimiter: The same instance for the same arguments
+        """
+        key = (float(rate), burst, os.path.abspath(path) if path else None)
+        with cls._shared_lock:
+            limiter = cls._shared.get(key)
+            if limiter is None:
+                if path is None:
+                    limiter = RateLimiter(rate, burst)
+                else:
+                    limiter = FileRateLimiter(path, rate, burst)
+                cls._shared[key] = limiter
+            return limiter
+    
+    def _reserve(self, tokens: float, updated: float, now: float) -> Tuple[float, float]:
+        """
+        Take one token from a bucket state.
+        
+        Args:
+            tokens (float): Tokens left at the last update, negative when
+                earlier callers already reserved future tokens
+            updated (float): Time of the last update
+            now (float): Current time
+            
+        Returns:
+            Tuple[float, float]: Tokens left after this request, and the
+            seconds to wait before sending it
+        """
+        tokens = min(self.burst, tokens + (now - updated) * self.rate) - 1
+        return tokens, max(0.0, -tokens / self.rate)
+    
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent.
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens, wait = self._reserve(self._tokens, self._updated, now)
+            self._updated = now
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class FileRateLimiter(RateLimiter):
+    """Token bucket kept in a locked file, shared by processes on one machine."""
+    
+    def __init__(self,
+                 path: str,
+                 rate: float,
+                 burst: Optional[float] = None):
+        """
+        Initialize the limiter.
+        
+        Args:
+            path (str): State file; every process using the same file shares
+                one bucket. Created when missing
+            rate (float): Sustained number of requests per second, for all
+                processes together
+            burst (Optional[float]): Maximum burst size
+        """
+        try:
+            import fcntl  # noqa: F401
+        except ImportError as e:
+            raise ImportError("FileRateLimiter requires fcntl (POSIX systems)") from e
+        super().__init__(rate, burst)
+        self.path = path
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+    
+    def acquire(self) -> float:
+        """
+        Wait until a request may be sent by any of the sharing processes.
+        
+        Returns:
+            float: Seconds spent waiting
+        """
+        import fcntl
+        
+        # Wall-clock time, since monotonic clocks are not comparable across processes
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            try:
+                tokens, updated = map(float, os.read(fd, 64).split())
+            except ValueError:
+                tokens, updated = self.burst, now
+            tokens, wait = self._reserve(tokens, updated, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, f'{tokens!r} {now!r}'.encode())
+        finally:
+            os.close(fd)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
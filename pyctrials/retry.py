@@ -0,0 +1,214 @@
+"""
+Retry policy shared by every request of a ClinicalTrialsAPI client.
+
+Failures are classified before retrying: timeouts, connection errors,
+interrupted transfers, 429 and 5xx responses are transient, while other
+4xx responses and malformed requests (invalid URLs, too many redirects)
+will fail the same way again and are raised at once. Retries wait a
+capped exponential backoff with full jitter, or the server's
+``Retry-After`` when it sends one. A client-wide retry budget lets retries
+add at most a fixed fraction of the request volume, so a degraded
+upstream cannot multiply the load placed on it.
+"""
+
+import logging
+import random
+import threading
+import time
+from collections import Counter
+from email.utils import parsedate_to_datetime
+from typing import Callable, Dict, Iterable, Optional, TypeVar
+
+from requests.exceptions import (
+    ChunkedEncodingError, ConnectionError, HTTPError, RequestException, Timeout
+)
+
+T = TypeVar('T')
+
+logger = logging.getLogger(__name__)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class RetryBudgetExceeded(RequestException):
+    """Raised instead of retrying when the client's retry budget is spent."""
+
+
+class RetryPolicy:
+    """Error classification, backoff and retry budget for API requests."""
+    
+    def __init__(self,
+                 max_retries: int = 5,
+                 base_delay: float = 0.5,
+                 max_delay: float = 30.0,
+                 max_retry_after: float = 300.0,
+                 jitter: bool = True,
+                 retry_statuses: Iterable[int] = RETRY_STATUSES,
+                 budget_ratio: float = 0.2,
+                 min_retries: int = 10):
+        """
+        Initialize the policy.
+        
+        Args:
+            max_retries (int): Maximum number of attempts per request
+            base_delay (float): Backoff before the first retry in seconds,
+                doubled after every further failure
+            max_delay (float): Upper bound of the backoff
+            max_retry_after (float): Longest Retry-After wait honored; when the
+                server asks for more, the request fails instead of being
+                retried early
+            jitter (bool): Wait a random time between 0 and the backoff
+                (full jitter) so that concurrent callers do not retry in step
+            retry_statuses (Iterable[int]): HTTP statuses worth retrying
+            budget_ratio (float): Retries earned by every request; 0.2 allows
+                one retry per five requests once the reserve is spent
+            min_retries (int): Reserve of retries, and the most that can be
+                saved up, so that low-traffic clients can still retry
+        """
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_retry_after = max_retry_after
+        self.jitter = jitter
+        self.retry_statuses = frozenset(retry_statuses)
+        self.budget_ratio = budget_ratio
+        self.min_retries = min_retries
+        self.stats = Counter()
+        self._balance = float(min_retries)
+        self._lock = threading.Lock()
+        self._context = threading.local()
+    
+    @property
+    def attempt(self) -> int:
+        """Number of the attempt in progress in the calling thread, starting at 1."""
+        return getattr(self._context, 'attempt', 1)
+    
+    def counts(self) -> Dict[str, int]:
+        """
+        Get a consistent copy of the policy's counters.
+        
+        Returns:
+            Dict[str, int]: Counts of requests, failures, retries,
+            not_retryable, retry_after_exceeded and budget_exhausted
+        """
+        with self._lock:
+            return dict(self.stats)
+    
+    def _count(self, name: str) -> None:
+        with self._lock:
+            self.stats[name] += 1
+    
+    def is_retryable(self, error: Exception) -> bool:
+        """
+        Tell whether a failed request may succeed when sent again.
+        
+        Args:
+            error (Exception): Error raised by the request
+            
+        Returns:
+            bool: True for timeouts, connection errors, interrupted transfers
+            and retryable statuses
+        """
+        if isinstance(error, (Timeout, ConnectionError, ChunkedEncodingError)):
+            return True
+        if isinstance(error, HTTPError):
+            response = error.response
+            return response is None or response.status_code in self.retry_statuses
+        return False
+    
+    @staticmethod
+    def retry_after(error: Exception) -> Optional[float]:
+        """
+        Read the wait requested by the server's Retry-After header.
+        
+        Args:
+            error (Exception): Error raised by the request
+            
+        Returns:
+            Optional[float]: Seconds to wait, or None without a valid header
+        """
+        response = getattr(error, 'response', None)
+        value = response.headers.get('Retry-After') if response is not None else None
+        if not value:
+            return None
+        try:
+            return max(0.0, float(value))
+        except ValueError:
+            pass
+        try:
+            return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+        except (TypeError, ValueError):
+            return None
+    
+    def delay(self, attempt: int, error: Optional[Exception] = None) -> float:
+        """
+        Compute the wait before the next attempt.
+        
+        Args:
+            attempt (int): Number of the failed attempt, starting at 0
+            error (Optional[Exception]): Error raised by the failed attempt
+            
+        Returns:
+            float: Seconds to wait
+        """
+        requested = self.retry_after(error) if error is not None else None
+        if requested is not None:
+            return min(requested, self.max_retry_after)
+        backoff = min(self.max_delay, self.base_delay * 2 ** attempt)
+        return random.uniform(0, backoff) if self.jitter else backoff
+    
+    def _deposit(self) -> None:
+        with self._lock:
+            self._balance = min(self._balance + self.budget_ratio, max(self.min_retries, 1))
+    
+    def _withdraw(self) -> bool:
+        with self._lock:
+            if self._balance < 1:
+                return False
+            self._balance -= 1
+            return True
+    
+    def call(self,
+             request: Callable[[], T],
+             on_retry: Optional[Callable[[int, Exception], None]] = None) -> T:
+        """
+        Run a request, retrying transient failures.
+        
+        Args:
+            request (Callable[[], T]): Sends the request and returns its result
+            on_retry (Optional[Callable[[int, Exception], None]]): Called with
+                the attempt number and the error before every retry
+            
+        Returns:
+            T: Result of the first successful attempt
+            
+        Raises:
+            RequestException: The error of the last attempt, or
+                RetryBudgetExceeded when the retry budget is spent
+        """
+        self._deposit()
+        self._count('requests')
+        for attempt in range(self.max_retries):
+            self._context.attempt = attempt + 1
+            try:
+                return request()
+            except RequestException as e:
+                logger.warning("Attempt %d failed: %s", attempt + 1, e)
+                self._count('failures')
+                if not self.is_retryable(e):
+                    self._count('not_retryable')
+                    raise
+                if attempt == self.max_retries - 1:
+                    raise
+                requested = self.retry_after(e)
+                if requested is not None and requested > self.max_retry_after:
+                    # Retrying before the server is ready would fail again
+                    self._count('retry_after_exceeded')
+                    raise
+                if not self._withdraw():
+                    self._count('budget_exhausted')
+                    raise RetryBudgetExceeded(f"Retry budget exhausted: {e}") from e
+                self._count('retries')
+                if on_retry is not None:
+                    on_retry(attempt, e)
+                time.sleep(self.delay(attempt, e))
@@ -0,0 +1,211 @@
+"""
+Local store of fetched trials for incremental synchronization.
+
+A TrialStore keeps the trials of one query in a directory together with
+the date of its last synchronization, so ClinicalTrialsAPI.sync only has
+to download the studies updated since then. A PageSpool checkpoints the
+pages of a query as they are fetched, so an interrupted crawl can resume.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Dict, Iterator, List, Optional
+
+import pandas as pd
+from pandas.api.types import union_categoricals
+
+
+class TrialStore:
+    """Directory holding the trials of a query and its sync state."""
+    
+    TRIALS_FILE = 'trials.pkl'
+    STATE_FILE = 'state.json'
+    
+    def __init__(self, directory: str):
+        """
+        Initialize the store.
+        
+        Args:
+            directory (str): Directory of the store, created if needed
+        """
+        self.directory = os.path.expanduser(os.fspath(directory))
+        os.makedirs(self.directory, exist_ok=True)
+    
+    def _path(self, name: str) -> str:
+        return os.path.join(self.directory, name)
+    
+    def state(self) -> Dict:
+        """
+        Read the sync state.
+        
+        Returns:
+            Dict: The stored 'query' key and 'last_sync' date, empty if the
+            store was never synchronized
+        """
+        try:
+            with open(self._path(self.STATE_FILE)) as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+    
+    def last_sync(self, query_key: str) -> Optional[str]:
+        """
+        Get the date of the last synchronization of a query.
+        
+        Args:
+            query_key (str): Key identifying the query
+            
+        Returns:
+            Optional[str]: ISO date of the last sync, or None if the store
+            holds no data for this query
+        """
+        state = self.state()
+        if state.get('query') != query_key:
+            return None
+        if not os.path.exists(self._path(self.TRIALS_FILE)):
+            return None
+        return state.get('last_sync')
+    
+    def load(self) -> pd.DataFrame:
+        """
+        Load the stored trials.
+        
+        Returns:
+            pd.DataFrame: Stored trials, empty if there are none
+        """
+        try:
+            return pd.read_pickle(self._path(self.TRIALS_FILE))
+        except (OSError, ValueError):
+            return pd.DataFrame()
+    
+    def save(self, trials: pd.DataFrame, query_key: str, last_sync: str) -> None:
+        """
+        Replace the stored trials and record the sync point.
+        
+        Args:
+            trials (pd.DataFrame): Trials to store
+            query_key (str): Key identifying the query
+            last_sync (str): ISO date the synchronization started on
+        """
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        os.close(fd)
+        trials.to_pickle(tmp_path)
+        os.replace(tmp_path, self._path(self.TRIALS_FILE))
+        
+        # The state is written last, so a failed save never advances it
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump({'query': query_key, 'last_sync': last_sync}, f)
+        os.replace(tmp_path, self._path(self.STATE_FILE))
+    
+    @staticmethod
+    def upsert(trials: pd.DataFrame, updates: pd.DataFrame) -> pd.DataFrame:
+        """
+        Insert new trials and replace updated ones, matching on nct_id.
+        
+        Args:
+            trials (pd.DataFrame): Current trials
+            updates (pd.DataFrame): Newly fetched trials
+            
+        Returns:
+            pd.DataFrame: Trials with the updates applied
+        """
+        if updates.empty:
+            return trials
+        if trials.empty:
+            return updates.reset_index(drop=True)
+        kept = trials[~trials['nct_id'].isin(updates['nct_id'])]
+        merged = pd.concat([kept, updates], ignore_index=True)
+        
+        # concat falls back to object/str when the categories of a compact
+        # column differ between the two frames; union them instead
+        for column in merged.columns.intersection(kept.columns).intersection(updates.columns):
+            current, updated = kept[column].dtype, updates[column].dtype
+            if (isinstance(current, pd.CategoricalDtype) and isinstance(updated, pd.CategoricalDtype)
+                    and current != updated):
+                merged[column] = union_categoricals(
+                    [kept[column], updates[column]], ignore_order=True
+                )
+        return merged
+
+
+class PageSpool:
+    """
+    Spool directory holding the pages fetched so far by one query.
+    
+    Every page is written as a pickle of its flattened records, followed by
+    the pagination state needed to request the next page, so an interrupted
+    query can resume after its last saved page without downloading the
+    earlier ones again.
+    """
+    
+    STATE_FILE = 'state.json'
+    
+    def __init__(self, directory: str, query_key: str):
+        """
+        Initialize the spool of a query.
+        
+        Args:
+            directory (str): Checkpoint directory shared by all queries
+            query_key (str): Key identifying the query
+        """
+        digest = hashlib.sha256(query_key.encode()).hexdigest()[:16]
+        self.directory = os.path.join(os.path.expanduser(os.fspath(directory)), digest)
+        self.query_key = query_key
+        self.pages = 0
+    
+    def _page_path(self, number: int) -> str:
+        return os.path.join(self.directory, f'page-{number:06d}.pkl')
+    
+    def resume(self, pager) -> Iterator[List[Dict]]:
+        """
+        Load the saved pages and move the pager past them.
+        
+        Args:
+            pager (_Pager): Pager of the query, restored in place
+            
+        Yields:
+            List[Dict]: Flattened records of each saved page
+        """
+        try:
+            with open(os.path.join(self.directory, self.STATE_FILE)) as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return
+        if state.get('query') != self.query_key:
+            return
+        
+        pager.restore(state['pager'])
+        self.pages = state['pages']
+        for number in range(1, self.pages + 1):
+            with open(self._page_path(number), 'rb') as f:
+                yield pickle.load(f)
+    
+    def append(self, records: List[Dict], pager_state: Dict) -> None:
+        """
+        Save a fetched page and the pagination state that follows it.
+        
+        Args:
+            records (List[Dict]): Flattened records of the page
+            pager_state (Dict): Pager state after the page
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        number = self.pages + 1
+        with open(self._page_path(number), 'wb') as f:
+            pickle.dump(records, f, protocol=pickle.HIGHEST_PROTOCOL)
+        
+        # Only advance the state once the page is safely on disk
+        state = {'query': self.query_key, 'pages': number, 'pager': pager_state}
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        with os.fdopen(fd, 'w') as f:
+            json.dump(state, f)
+        os.replace(tmp_path, os.path.join(self.directory, self.STATE_FILE))
+        self.pages = number
+    
+    def remove(self) -> None:
+        """Delete the spool once the query has completed."""
+        shutil.rmtree(self.directory, ignore_errors=True)
@@ -0,0 +1,238 @@
+"""
+Synthetic ClinicalTrials.gov payloads shared by the tests and benchmarks.
+"""
+
+import json
+import re
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+STATUSES = ['RECRUITING', 'COMPLETED', 'ACTIVE_NOT_RECRUITING', 'TERMINATED']
+PHASES = [['PHASE1'], ['PHASE2'], ['PHASE2', 'PHASE3'], ['PHASE3'], []]
+COUNTRIES = ['United States', 'France', 'Germany', 'Japan', 'Brazil']
+
+
+def make_study(i: int) -> Dict:
+    """
+    Build a synthetic study document shaped like an API v2 study.
+    
+    Args:
+        i (int): Index used to derive the NCT ID and field values
+        
+    Returns:
+        Dict: Raw study data
+    """
+    locations = [
+        {
+            'facility': f'Hospital {i}-{j}',
+            'city': f'City {(i + j) % 50}',
+            'country': COUNTRIES[(i + j) % len(COUNTRIES)],
+            'status': 'RECRUITING',
+            **({'geoPoint': {'lat': 40.0 + j, 'lon': -70.0 - j}} if j == 0 else {}),
+        }
+        for j in range(i % 3)
+    ]
+    protocol = {
+        'identificationModule': {
+            'nctId': f'NCT{i:08d}',
+            'orgStudyIdInfo': {'id': f'ORG-{i}'},
+            'briefTitle': f'Synthetic study {i}',
+        },
+        'statusModule': {
+            'overallStatus': STATUSES[i % len(STATUSES)],
+            'completionDateStruct': {
+                'date': f'20{15 + i % 14:02d}-{1 + i % 12:02d}-{1 + i % 28:02d}'
+            },
+            'lastUpdatePostDateStruct': {'date': '2024-01-01'},
+        },
+        'sponsorCollaboratorsModule': {
+            'leadSponsor': {'name': f'Sponsor {i % 20}'},
+        },
+        'descriptionModule': {'briefSummary': f'Summary of study {i}. ' * 5},
+        'conditionsModule': {
+            'conditions': [f'Condition {i % 7}'],
+            'keywords': [f'keyword{i % 5}', f'keyword{i % 11}'],
+        },
+        'designModule': {
+            'enrollmentInfo': {'count': 10 + i % 500},
+            'studyType': 'INTERVENTIONAL',
+            'phases': PHASES[i % len(PHASES)],
+        },
+    }
+    if i % 10 != 9:
+        protocol['statusModule']['startDateStruct'] = {
+            'date': f'20{10 + i % 14:02d}-{1 + i % 12:02d}'
+        }
+    if locations:
+        protocol['contactsLocationsModule'] = {'locations': locations}
+    return {'protocolSection': protocol}
+
+
+def make_pages(n_studies: int, page_size: int) -> List[Dict]:
+    """
+    Split synthetic studies into API response pages.
+    
+    Args:
+        n_studies (int): Total number of studies
+        page_size (int): Number of studies per page
+        
+    Returns:
+        List[Dict]: Response payloads linked through ``nextPageToken``
+    """
+    pages = []
+    for start in range(0, n_studies, page_size):
+        page = {
+            'studies': [
+                make_study(i)
+                for i in range(start, min(start + page_size, n_studies))
+            ]
+        }
+        if start + page_size < n_studies:
+            page['nextPageToken'] = str(start + page_size)
+        pages.append(page)
+    return pages
+
+
+class MockServer:
+    """
+    Local HTTP server imitating the studies and version endpoints.
+    
+    Pages are addressed by an offset ``pageToken``. ``latency`` delays every
+    response and ``failures`` makes the next N study requests fail with
+    ``failure_status`` (with a ``Retry-After`` header when ``retry_after``
+    is set) and ``slow`` delays the next N study requests by
+    ``slow_latency``. ``updated`` maps study indexes to a new
+    LastUpdatePostDate, which ``filter.advanced`` range filters honor.
+    """
+    
+    def __init__(self, n_studies: int = 25, latency: float = 0.0):
+        self.n_studies = n_studies
+        self.latency = latency
+        self.failures = 0
+        self.failure_status = 503
+        self.retry_after: Optional[str] = None
+        self.slow = 0
+        self.slow_latency = 1.0
+        self.data_timestamp = '2024-05-01T09:00:00'
+        self.updated: Dict[int, str] = {}
+        self.requests: List[Dict] = []
+        self._lock = threading.Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', 0), self._handler())
+        self._server.daemon_threads = True
+        self.url = f'http://127.0.0.1:{self._server.server_address[1]}/api/v2'
+    
+    def __enter__(self) -> 'MockServer':
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+    
+    def __exit__(self, *exc_info) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+    
+    def configure(self, client):
+        """Point a client at this server and return it."""
+        client.BASE_URL = f'{self.url}/studies'
+        client.VERSION_URL = f'{self.url}/version'
+        return client
+    
+    @property
+    def study_requests(self) -> List[Dict]:
+        return [params for params in self.requests if params['path'].endswith('/studies')]
+    
+    def study(self, i: int) -> Dict:
+        study = make_study(i)
+        if i in self.updated:
+            status = study['protocolSection']['statusModule']
+            status['lastUpdatePostDateStruct']['date'] = self.updated[i]
+            study['protocolSection']['identificationModule']['briefTitle'] += ' (updated)'
+        return study
+    
+    def matching(self, params: Dict) -> List[int]:
+        """Apply the RANGE and MISSING clauses of ``filter.advanced``."""
+        expression = params.get('filter.advanced', '')
+        indexes = list(range(self.n_studies))
+        for area, low, high in re.findall(r'AREA\[(\w+)\]RANGE\[([^,]+),([^\]]+)\]', expression):
+            indexes = [
+                i for i in indexes
+                if self.date(i, area) is not None
+                and (low == 'MIN' or self.date(i, area) >= low)
+                and (high == 'MAX' or self.date(i, area) <= high)
+            ]
+        for area in re.findall(r'AREA\[(\w+)\]MISSING', expression):
+            indexes = [i for i in indexes if self.date(i, area) is None]
+        return indexes
+    
+    def date(self, i: int, area: str) -> Optional[str]:
+        """Full-precision date of a study, as compared by range filters."""
+        status = self.study(i)['protocolSection']['statusModule']
+        struct = {
+            'StartDate': 'startDateStruct',
+            'LastUpdatePostDate': 'lastUpdatePostDateStruct',
+        }[area]
+        value = status.get(struct, {}).get('date')
+        if value is not None and len(value) == 7:
+            value += '-01'
+        return value
+    
+    def studies_payload(self, params: Dict) -> Dict:
+        indexes = self.matching(params)
+        page_size = int(params.get('pageSize', 10))
+        start = int(params.get('pageToken', 0))
+        end = min(start + page_size, len(indexes))
+        payload = {'studies': [self.study(i) for i in indexes[start:end]]}
+        if end < len(indexes):
+            payload['nextPageToken'] = str(end)
+        if params.get('countTotal') == 'true':
+            payload['totalCount'] = len(indexes)
+        return payload
+    
+    def _handler(self):
+        server = self
+        
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, *args):
+                pass
+            
+            def do_GET(self):
+                url = urlparse(self.path)
+                params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+                params['path'] = url.path
+                with server._lock:
+                    server.requests.append(params)
+                    fail = url.path.endswith('/studies') and server.failures > 0
+                    if fail:
+                        server.failures -= 1
+                    slow = url.path.endswith('/studies') and server.slow > 0
+                    if slow:
+                        server.slow -= 1
+                if server.latency:
+                    time.sleep(server.latency)
+                if slow:
+                    time.sleep(server.slow_latency)
+                if fail:
+                    headers = {'Retry-After': server.retry_after} if server.retry_after else {}
+                    self._send(server.failure_status, {'error': 'unavailable'}, headers)
+                elif url.path.endswith('/version'):
+                    self._send(200, {
+                        'apiVersion': '2.0.3',
+                        'dataTimestamp': server.data_timestamp
+                    })
+                elif url.path.endswith('/studies'):
+                    self._send(200, server.studies_payload(params))
+                else:
+                    self._send(404, {'error': 'not found'})
+            
+            def _send(self, status: int, payload: Dict, headers: Optional[Dict] = None):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+        
+        return Handler
@@ -0,0 +1,51 @@
+import asyncio
+import time
+
+from pyctrials import AsyncClinicalTrialsAPI
+from tests.helpers import MockServer
+
+
+def make_client(server, max_concurrency):
+    client = AsyncClinicalTrialsAPI(max_concurrency=max_concurrency, retry_delay=0)
+    server.configure(client.client)
+    return client
+
+
+def test_async_fetch_trials_paginates():
+    with MockServer(n_studies=25) as server:
+        client = make_client(server, 2)
+        
+        async def run():
+            pages = [page async for page in client.iter_pages('x', page_size=10)]
+            trials = await client.fetch_trials('x', page_size=10)
+            return pages, trials
+        
+        pages, trials = asyncio.run(run())
+        client.close()
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert len(trials) == 25
+
+
+def test_async_fetch_retries_failed_pages():
+    with MockServer(n_studies=5) as server:
+        server.failures = 2
+        client = make_client(server, 1)
+        trials = asyncio.run(client.fetch_trials('x'))
+        client.close()
+    assert len(trials) == 5
+    assert len(server.study_requests) == 3
+
+
+def test_gather_trials_scales_with_concurrency():
+    conditions = [f'condition {i}' for i in range(8)]
+    timings = {}
+    for concurrency in (1, 8):
+        with MockServer(n_studies=5, latency=0.05) as server:
+            client = make_client(server, concurrency)
+            start = time.perf_counter()
+            results = asyncio.run(client.gather_trials(conditions))
+            timings[concurrency] = time.perf_counter() - start
+            client.close()
+        assert set(results) == set(conditions)
+        assert all(len(df) == 5 for df in results.values())
+    assert timings[8] < timings[1] / 2
@@ -0,0 +1,59 @@
+import json
+import zipfile
+
+import pandas as pd
+import pytest
+
+from pyctrials import ClinicalTrialParser, load_bulk_archive
+from tests.helpers import make_study
+
+
+def make_archive(path, n_studies):
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        archive.writestr('ctg-studies/', '')
+        for i in range(n_studies):
+            archive.writestr(f'ctg-studies/NCT{i:08d}.json', json.dumps(make_study(i)))
+        archive.writestr('ctg-studies/README.txt', 'not a study')
+    return str(path)
+
+
+def test_load_bulk_archive_in_process_and_in_parallel(tmp_path):
+    path = make_archive(tmp_path / 'studies.zip', 40)
+    serial = load_bulk_archive(path, workers=0, chunk_size=7)
+    parallel = load_bulk_archive(path, workers=2, chunk_size=7)
+    
+    assert len(serial) == 40
+    assert list(serial['nct_id']) == [f'NCT{i:08d}' for i in range(40)]
+    assert pd.api.types.is_datetime64_any_dtype(serial['completion_date'])
+    assert serial.equals(parallel)
+
+
+def test_load_bulk_archive_builds_sites_in_the_same_pass(tmp_path):
+    path = make_archive(tmp_path / 'studies.zip', 12)
+    trials, sites = load_bulk_archive(path, workers=2, chunk_size=5, sites=True)
+    _, serial_sites = load_bulk_archive(path, workers=0, sites=True)
+    
+    assert len(trials) == 12
+    assert list(sites.columns) == list(ClinicalTrialParser.SITE_SCHEMA)
+    assert len(sites) == sum(i % 3 for i in range(12))
+    assert isinstance(sites['country'].dtype, pd.CategoricalDtype)
+    assert sites.equals(serial_sites)
+
+
+def test_load_bulk_archive_writes_output(tmp_path):
+    path = make_archive(tmp_path / 'studies.zip', 5)
+    parser = ClinicalTrialParser()
+    parser.register_field('sponsor_name', 'protocolSection.sponsorCollaboratorsModule.leadSponsor.name')
+    trials = load_bulk_archive(path, output=str(tmp_path / 'trials.csv'), workers=0, parser=parser)
+    written = pd.read_csv(tmp_path / 'trials.csv')
+    assert list(written['nct_id']) == list(trials['nct_id'])
+    assert (trials['sponsor_name'] == trials['sponsor']).all()
+
+
+def test_load_bulk_archive_writes_parquet_with_fixed_schema(tmp_path):
+    pytest.importorskip('pyarrow')
+    path = make_archive(tmp_path / 'studies.zip', 5)
+    trials = load_bulk_archive(path, output=str(tmp_path / 'trials.parquet'), workers=0)
+    written = pd.read_parquet(tmp_path / 'trials.parquet')
+    assert list(written.columns) == list(trials.columns)
+    assert list(written['nct_id']) == list(trials['nct_id'])
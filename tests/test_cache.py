@@ -0,0 +1,60 @@
+import os
+
+from pyctrials import ClinicalTrialsAPI, ResponseCache
+from tests.helpers import MockServer
+
+
+def test_repeat_query_is_served_from_cache(tmp_path):
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI(cache=str(tmp_path)))
+        first = client.fetch_trials('x', page_size=10)
+        second = client.fetch_trials('x', page_size=10)
+    assert first.equals(second)
+    assert len(server.study_requests) == 3
+    stats = client.cache.stats()
+    assert (stats['hits'], stats['misses'], stats['entries']) == (3, 3, 3)
+
+
+def test_cache_key_ignores_parameter_order_and_unset_values():
+    a = ResponseCache.key('u', {'b': 1, 'a': 'x', 'pageToken': None})
+    b = ResponseCache.key('u', {'a': 'x', 'b': '1'})
+    assert a == b
+    assert a != ResponseCache.key('u', {'a': 'x', 'b': '1', 'pageToken': 't'})
+
+
+def test_expired_entries_are_misses(tmp_path):
+    cache = ResponseCache(str(tmp_path), ttl=-1)
+    cache.set('u', {}, b'{}')
+    assert cache.get('u', {}) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    payload = os.urandom(1000)
+    cache = ResponseCache(str(tmp_path), max_bytes=3500)
+    for page in range(3):
+        cache.set('u', {'page': page}, payload)
+        os.utime(cache._path(cache.key('u', {'page': page})), (page, page))
+    cache.get('u', {'page': 0})
+    cache.set('u', {'page': 3}, payload)
+    assert cache.get('u', {'page': 0}) == payload
+    assert cache.get('u', {'page': 1}) is None
+    assert cache.stats()['bytes'] <= 3500
+
+
+def test_new_data_version_invalidates_cached_pages(tmp_path):
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI(cache=str(tmp_path)))
+        client.fetch_trials('x', page_size=10)
+        
+        # A second client finds the version unchanged and reuses the pages
+        other = server.configure(ClinicalTrialsAPI(cache=str(tmp_path)))
+        other.fetch_trials('x', page_size=10)
+        assert len(server.study_requests) == 3
+        
+        server.data_timestamp = '2024-05-02T09:00:00'
+        other.get_version()
+        assert other.cache.stats()['entries'] == 0
+        other.fetch_trials('x', page_size=10)
+    assert len(server.study_requests) == 6
+    assert other.cache.data_version == '2024-05-02T09:00:00'
@@ -0,0 +1,132 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from requests.exceptions import ConnectionError
+
+from pyctrials import ClinicalTrialsAPI, RateLimiter
+from pyctrials.circuit import CircuitBreaker, CircuitOpenError
+from tests.helpers import MockServer
+
+
+def test_circuit_opens_on_upstream_errors_and_recovers():
+    breaker = CircuitBreaker(window=5, min_requests=3, reset_timeout=0.2)
+    with MockServer(n_studies=5) as server:
+        client = server.configure(
+            ClinicalTrialsAPI(max_retries=10, retry_delay=0, circuit_breaker=breaker)
+        )
+        server.failures = 100
+        with pytest.raises(CircuitOpenError):
+            client.fetch_trials('x')
+        # The breaker stopped the retries after three failed requests
+        assert len(server.study_requests) == 3
+        assert client.stats()['circuit_state'] == 'open'
+        
+        server.failures = 0
+        time.sleep(0.25)
+        assert len(client.fetch_trials('x')) == 5
+    stats = client.stats()
+    assert stats['circuit_state'] == 'closed'
+    assert (stats['circuit_opened'], stats['circuit_closed'], stats['circuit_rejected']) == (1, 1, 1)
+
+
+def test_only_the_probe_decides_a_half_open_circuit():
+    breaker = CircuitBreaker(window=2, min_requests=2, reset_timeout=0)
+    started = {name: threading.Event() for name in ('straggler', 'probe')}
+    release = {name: threading.Event() for name in ('straggler', 'probe')}
+    
+    def blocking(name, error=None):
+        def request():
+            started[name].set()
+            release[name].wait(5)
+            if error is not None:
+                raise error
+            return name
+        return request
+    
+    def failing():
+        raise ConnectionError('down')
+    
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        straggler = executor.submit(breaker.call, blocking('straggler'))
+        assert started['straggler'].wait(5)
+        for _ in range(2):
+            with pytest.raises(ConnectionError):
+                breaker.call(failing)
+        assert breaker.state == 'open'
+        
+        probe = executor.submit(breaker.call, blocking('probe', ConnectionError('still down')))
+        assert started['probe'].wait(5)
+        # A request admitted before the circuit opened succeeds meanwhile
+        release['straggler'].set()
+        assert straggler.result() == 'straggler'
+        assert breaker.state == 'half_open'
+        
+        release['probe'].set()
+        with pytest.raises(ConnectionError):
+            probe.result()
+    assert breaker.state == 'open'
+    assert breaker.stats['closed'] == 0
+
+
+def test_client_errors_do_not_open_the_circuit():
+    breaker = CircuitBreaker(window=5, min_requests=2)
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI(circuit_breaker=breaker))
+        server.failure_status = 400
+        for _ in range(3):
+            server.failures = 1
+            with pytest.raises(Exception):
+                client.fetch_trials('x')
+    assert breaker.state == 'closed'
+
+
+def test_slow_requests_are_hedged():
+    with MockServer(n_studies=30) as server:
+        client = server.configure(ClinicalTrialsAPI(hedge_percentile=90))
+        # Warm up the latency window with fast requests
+        client.fetch_trials('x', page_size=1, max_results=25)
+        server.slow, server.slow_latency = 1, 2.0
+        start = time.perf_counter()
+        trials = client.fetch_trials('y', page_size=5)
+        elapsed = time.perf_counter() - start
+        client.close()
+    assert len(trials) == 30
+    assert elapsed < 1.5
+    stats = client.stats()
+    assert stats['hedge_requests'] >= 1
+    assert stats['hedge_wins'] >= 1
+
+
+def test_rate_limiter_waits_are_not_counted_as_hedge_latency():
+    with MockServer(n_studies=30) as server:
+        client = server.configure(
+            ClinicalTrialsAPI(hedge_percentile=95, rate_limit=RateLimiter(25, burst=1))
+        )
+        trials = client.fetch_trials('x', page_size=1)
+        client.close()
+    assert trials.attrs['metrics']['throttle_seconds'] > 0.5
+    # Every request waited about 40 ms for a token; the latencies exclude it
+    assert client.hedger.threshold() < 0.03
+
+
+def test_every_hedged_copy_takes_a_rate_limiter_token():
+    class CountingLimiter(RateLimiter):
+        tokens = 0
+        
+        def acquire(self):
+            CountingLimiter.tokens += 1
+            return super().acquire()
+    
+    with MockServer(n_studies=30) as server:
+        client = server.configure(
+            ClinicalTrialsAPI(hedge_percentile=90, rate_limit=CountingLimiter(1000))
+        )
+        client.fetch_trials('x', page_size=1, max_results=25)
+        server.slow, server.slow_latency = 2, 1.0
+        client.fetch_trials('y', page_size=5)
+        client.close()
+        requests = len(server.study_requests)
+    assert client.stats()['hedge_requests'] >= 1
+    assert CountingLimiter.tokens == requests
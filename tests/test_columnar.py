@@ -0,0 +1,144 @@
+import pandas as pd
+import pytest
+
+from pyctrials import ClinicalTrialParser, ClinicalTrialsAPI
+from pyctrials.columnar import ColumnBuilder, child_tables
+from tests.helpers import MockServer, make_study
+
+
+def test_every_page_has_the_same_schema():
+    with MockServer(n_studies=4) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        # Study 0 has no locations and study 3 has no start date
+        pages = list(client.iter_pages('x', page_size=1))
+    assert len(pages) == 4
+    for page in pages:
+        assert list(page.columns) == ColumnBuilder(ClinicalTrialParser().schema()).columns()
+        assert list(page.dtypes) == list(pages[0].dtypes)
+    assert str(pages[0]['enrollment_count'].dtype) == 'Int64'
+    assert pd.api.types.is_datetime64_any_dtype(pages[0]['start_date'])
+
+
+def test_builder_handles_missing_values_and_columnar_input():
+    schema = ClinicalTrialParser().schema()
+    parser = ClinicalTrialParser()
+    builder = ColumnBuilder(schema)
+    builder.append(parser.flatten(make_study(1)))
+    builder.append({'nct_id': 'NCT1', 'enrollment_count': None})
+    builder.extend_columns({'nct_id': ['NCT2', 'NCT3'], 'enrollment_count': [5, 'n/a']})
+    df = builder.to_frame()
+    assert list(df['nct_id']) == ['NCT00000001', 'NCT1', 'NCT2', 'NCT3']
+    assert df['enrollment_count'].tolist() == [11, pd.NA, 5, pd.NA]
+    assert df['locations'].isna().tolist() == [False, True, True, True]
+
+
+def test_builder_to_arrow_uses_fixed_types():
+    pa = pytest.importorskip('pyarrow')
+    builder = ColumnBuilder(ClinicalTrialParser().schema())
+    builder.extend(ClinicalTrialParser.flatten_trial(make_study(i)) for i in range(3))
+    table = builder.to_arrow()
+    assert table.num_rows == 3
+    assert table.schema.field('enrollment_count').type == pa.int64()
+    assert table.schema.field('locations').type == pa.string()
+    assert table.column('locations').null_count == 1
+
+
+def test_compact_frames_use_memory_efficient_dtypes():
+    with MockServer(n_studies=30) as server:
+        default = server.configure(ClinicalTrialsAPI()).fetch_trials('x', page_size=10)
+        compact = server.configure(ClinicalTrialsAPI(compact=True)).fetch_trials('x', page_size=10)
+    
+    for column in ['overall_status', 'last_known_status', 'sponsor', 'study_type', 'phase']:
+        assert isinstance(compact[column].dtype, pd.CategoricalDtype)
+    assert str(compact['enrollment_count'].dtype) == 'Int32'
+    assert isinstance(compact['brief_summary'].dtype, pd.StringDtype)
+    
+    assert compact['sponsor'].astype(object).equals(default['sponsor'])
+    assert compact['enrollment_count'].astype('Int64').equals(default['enrollment_count'])
+    assert (compact.memory_usage(deep=True).sum()
+            < default.memory_usage(deep=True).sum())
+
+
+def test_list_columns_and_child_tables():
+    with MockServer(n_studies=6) as server:
+        client = server.configure(ClinicalTrialsAPI(list_columns=True))
+        trials = client.fetch_trials('x', page_size=4)
+    
+    for column in ClinicalTrialParser.LIST_COLUMNS:
+        assert all(isinstance(value, list) for value in trials[column])
+    assert trials['locations'].map(len).tolist() == [i % 3 for i in range(6)]
+    
+    tables = child_tables(trials)
+    assert set(tables) == set(ClinicalTrialParser.LIST_COLUMNS)
+    locations = tables['locations']
+    assert list(locations.columns) == ['nct_id', 'locations']
+    assert len(locations) == sum(i % 3 for i in range(6))
+    assert locations['nct_id'].tolist() == trials['nct_id'].repeat(trials['locations'].map(len)).tolist()
+    
+    empty = child_tables(trials.iloc[:0])
+    assert set(empty) == set(ClinicalTrialParser.LIST_COLUMNS)
+    assert list(empty['keywords'].columns) == ['nct_id', 'keywords']
+    assert empty['keywords'].empty
+    assert set(child_tables(trials, schema={'nct_id': 'str', 'phase': 'list'})) == {'phase'}
+
+
+def test_list_columns_become_arrow_lists():
+    pa = pytest.importorskip('pyarrow')
+    parser = ClinicalTrialParser(list_columns=True)
+    builder = ColumnBuilder(parser.schema())
+    builder.extend(parser.flatten(make_study(i)) for i in range(3))
+    assert builder.to_arrow().schema.field('conditions').type == pa.list_(pa.string())
+
+
+def test_fetch_sites_builds_a_coded_sites_table():
+    with MockServer(n_studies=12) as server:
+        sites = server.configure(ClinicalTrialsAPI()).fetch_sites('x', page_size=5)
+    
+    assert list(sites.columns) == list(ClinicalTrialParser.SITE_SCHEMA)
+    assert len(sites) == sum(i % 3 for i in range(12))
+    assert sites['nct_id'].tolist()[:3] == ['NCT00000001', 'NCT00000002', 'NCT00000002']
+    for column in ['city', 'country']:
+        assert isinstance(sites[column].dtype, pd.CategoricalDtype)
+        assert sites[column].cat.codes.dtype.kind == 'i'
+    assert sites['country'].tolist()[:3] == ['France', 'Germany', 'Japan']
+    assert sites['latitude'].tolist()[:2] == [40.0, 40.0]
+    assert pd.isna(sites['latitude']).sum() == sum(1 for i in range(12) if i % 3 == 2)
+    assert sites['country'].value_counts().sum() == len(sites)
+
+
+def test_fetch_trials_builds_sites_in_the_same_crawl():
+    with MockServer(n_studies=12) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        expected = client.fetch_sites('x', page_size=5)
+        requests_before = len(server.study_requests)
+        trials, sites = client.fetch_trials('x', page_size=5, sites=True)
+        assert len(server.study_requests) - requests_before == 3
+    
+    assert len(trials) == 12
+    assert 'sites' not in trials.columns
+    assert sites.equals(expected)
+
+
+def test_code_columns_to_arrow_are_dictionaries():
+    pa = pytest.importorskip('pyarrow')
+    builder = ColumnBuilder(ClinicalTrialParser.SITE_SCHEMA)
+    builder.extend(ClinicalTrialParser.flatten_sites(make_study(5)))
+    builder.append({'nct_id': 'NCT1'})
+    table = builder.to_arrow()
+    assert pa.types.is_dictionary(table.schema.field('country').type)
+    assert table.column('country').null_count == 1
+    assert table.column('latitude').to_pylist() == [40.0, None, None]
+
+
+def test_partial_dates_are_parsed_with_their_precision():
+    builder = ColumnBuilder({'start_date': 'date'})
+    builder.extend_columns({'start_date': ['2023-05', '2023-05-17', None, '2023', 'soon', '2023-05']})
+    df = builder.to_frame()
+    assert list(df.columns) == ['start_date', 'start_date_precision']
+    assert df['start_date'].tolist()[:2] == [pd.Timestamp('2023-05-01'), pd.Timestamp('2023-05-17')]
+    assert df['start_date'].isna().tolist() == [False, False, True, False, True, False]
+    assert df['start_date'].iloc[3] == pd.Timestamp('2023-01-01')
+    precision = df['start_date_precision']
+    assert precision.isna().tolist() == df['start_date'].isna().tolist()
+    assert precision.dropna().tolist() == ['month', 'day', 'year', 'month']
+    assert list(df['start_date_precision'].cat.categories) == ['year', 'month', 'day']
@@ -0,0 +1,49 @@
+from collections import defaultdict
+
+from pyctrials import ClinicalTrialsAPI
+from tests.helpers import MockServer
+
+
+def collect(client):
+    events = defaultdict(list)
+    client.add_hook(lambda event, data: events[event].append(data))
+    return events
+
+
+def test_events_cover_every_request_and_stage():
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        events = collect(client)
+        trials = client.fetch_trials('x', page_size=10)
+    
+    requests = events['request']
+    assert [r['status'] for r in requests] == [200, 200, 200]
+    assert all(r['attempt'] == 1 and r['bytes'] > 0 and not r['cache_hit'] for r in requests)
+    assert all(r['seconds'] >= r['wait_seconds'] >= 0 for r in requests)
+    assert [d['studies'] for d in events['flatten']] == [10, 10, 5]
+    assert len(events['decode']) == len(events['accumulate']) == 3
+    assert [d['rows'] for d in events['dates'] + events['build']] == [25, 25]
+    
+    metrics = trials.attrs['metrics']
+    assert (metrics['requests'], metrics['studies'], metrics['rows']) == (3, 25, 25)
+    assert metrics['bytes'] == sum(r['bytes'] for r in requests)
+    for stage in ['request', 'decode', 'flatten', 'accumulate', 'dates', 'build']:
+        assert metrics[f'{stage}_seconds'] >= 0
+    assert metrics['wall_seconds'] >= metrics['request_seconds']
+
+
+def test_failed_attempts_and_cache_hits_are_reported(tmp_path):
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI(retry_delay=0, cache=str(tmp_path)))
+        events = collect(client)
+        server.failures = 1
+        first = client.fetch_trials('x')
+        second = client.fetch_trials('x')
+    
+    studies = [r for r in events['request'] if r['url'].endswith('/studies')]
+    assert [(r['status'], r['attempt'], r['cache_hit']) for r in studies] == [
+        (503, 1, False), (200, 2, False), (200, 1, True)
+    ]
+    assert 'error' in studies[0]
+    assert (first.attrs['metrics']['retries'], first.attrs['metrics']['request_errors']) == (1, 1)
+    assert second.attrs['metrics']['cache_hits'] == 1
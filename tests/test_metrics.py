@@ -0,0 +1,100 @@
+import gc
+import logging
+import urllib.request
+
+import pytest
+
+from pyctrials import (
+    CircuitBreaker, CircuitOpenError, ClinicalTrialsAPI, MetricsRegistry, RetryPolicy
+)
+from tests.helpers import MockServer
+
+
+def test_registry_records_client_events_and_renders_prometheus_text(tmp_path):
+    registry = MetricsRegistry()
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI(retry_delay=0, metrics=registry, cache=str(tmp_path)))
+        server.failures = 1
+        client.fetch_trials('x', page_size=10)
+        client.fetch_trials('x', page_size=10)
+    
+    assert registry.requests.value(endpoint='studies', status=200, source='network') == 3
+    assert registry.requests.value(endpoint='studies', status=503, source='network') == 1
+    assert registry.requests.value(endpoint='studies', status=200, source='cache') == 3
+    assert registry.request_seconds.count(endpoint='studies') == 4
+    assert registry.retries.value() == 1
+    assert registry.studies.value() == 50
+    assert registry.rows.value() == 50
+    
+    text = registry.render()
+    assert '# TYPE pyctrials_requests_total counter' in text
+    assert 'pyctrials_requests_total{endpoint="studies",source="cache",status="200"} 3' in text
+    assert 'pyctrials_request_duration_seconds_bucket{endpoint="studies",le="+Inf"} 4' in text
+    assert 'pyctrials_stage_seconds_total{stage="flatten"}' in text
+    
+    path = tmp_path / 'pyctrials.prom'
+    registry.write(str(path))
+    assert path.read_text() == text
+
+
+def test_registry_exports_circuit_hedge_and_retry_budget_series(caplog):
+    # Captured warnings would keep the failed requests' frames, and the client, alive
+    caplog.set_level(logging.ERROR, logger='pyctrials')
+    registry = MetricsRegistry()
+    breaker = CircuitBreaker(window=4, min_requests=2, reset_timeout=60)
+    policy = RetryPolicy(base_delay=0, budget_ratio=0, min_retries=0)
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI(
+            retry_policy=policy, circuit_breaker=breaker, hedge_percentile=95, metrics=registry
+        ))
+        server.failures = 100
+        for error in [Exception, Exception, CircuitOpenError]:
+            with pytest.raises(error):
+                client.fetch_trials('x')
+        client.close()
+    
+    text = registry.render()
+    assert 'pyctrials_retry_budget_exhausted_total 2' in text
+    assert '# TYPE pyctrials_circuit_state gauge' in text
+    assert 'pyctrials_circuit_state{state="open"} 1' in text
+    assert 'pyctrials_circuit_state{state="closed"} 0' in text
+    assert 'pyctrials_circuit_opened_total 1' in text
+    assert 'pyctrials_circuit_rejected_total 1' in text
+    assert 'pyctrials_hedged_requests_total 0' in text
+    assert 'pyctrials_hedge_wins_total 0' in text
+    
+    # The counters stay monotonic once the client is collected
+    del client, breaker, policy
+    gc.collect()
+    text = registry.render()
+    assert 'pyctrials_retry_budget_exhausted_total 2' in text
+    assert 'pyctrials_circuit_opened_total 1' in text
+    assert 'pyctrials_circuit_rejected_total 1' in text
+    assert 'pyctrials_circuit_state{state="open"} 0' in text
+
+
+def test_registry_is_served_over_http():
+    registry = MetricsRegistry()
+    registry.retries.inc()
+    server = registry.serve(port=0)
+    try:
+        url = f'http://127.0.0.1:{server.server_address[1]}/metrics'
+        with urllib.request.urlopen(url) as response:
+            body = response.read().decode()
+            assert response.headers['Content-Type'].startswith('text/plain; version=0.0.4')
+    finally:
+        server.shutdown()
+        server.server_close()
+    assert 'pyctrials_retries_total 1' in body
+
+
+def test_failed_attempts_are_logged_not_printed(capsys, caplog):
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI(retry_delay=0))
+        server.failures = 1
+        with caplog.at_level(logging.WARNING, logger='pyctrials'):
+            client.fetch_trials('x')
+    assert capsys.readouterr().out == ''
+    assert [r.getMessage().startswith('Attempt 1 failed') for r in caplog.records] == [True]
+    assert caplog.records[0].name == 'pyctrials.retry'
+    assert any(isinstance(h, logging.NullHandler) for h in logging.getLogger('pyctrials').handlers)
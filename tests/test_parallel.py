@@ -0,0 +1,78 @@
+import json
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pyctrials import ClinicalTrialParser, ClinicalTrialsAPI
+from pyctrials.parallel import (
+    columns_to_records, flatten_columns, flatten_page, iter_flattened_chunks
+)
+from tests.helpers import MockServer, make_study
+
+
+def test_flatten_columns_pads_missing_columns():
+    parser = ClinicalTrialParser()
+    # Study 0 has no locations, study 1 has some
+    columns = flatten_columns(parser, [make_study(0), json.dumps(make_study(1)).encode()])
+    assert columns['locations'][0] is None
+    assert columns['locations'][1].startswith('Hospital 1-0')
+    assert [r['nct_id'] for r in columns_to_records(columns)] == ['NCT00000000', 'NCT00000001']
+
+
+def test_process_pool_flattening_matches_in_process():
+    parser = ClinicalTrialParser()
+    studies = [make_study(i) for i in range(100)]
+    expected = [parser.flatten(study) for study in studies]
+    with ProcessPoolExecutor(max_workers=2) as executor:
+        chunks = list(iter_flattened_chunks(parser, studies, executor, chunk_size=15))
+    records = [r for columns in chunks for r in columns_to_records(columns)]
+    assert len(chunks) == 7
+    assert [r['nct_id'] for r in records] == [r['nct_id'] for r in expected]
+    assert records[5] == expected[5]
+
+
+def test_flatten_page_decodes_and_trims_raw_responses():
+    parser = ClinicalTrialParser()
+    content = json.dumps({'studies': [make_study(i) for i in range(5)]}).encode()
+    columns, events = flatten_page(parser, content, limit=3)
+    assert columns['nct_id'] == ['NCT00000000', 'NCT00000001', 'NCT00000002']
+    assert events['decode']['bytes'] == len(content)
+    assert events['flatten']['studies'] == 3
+
+
+def test_client_flattens_large_pages_in_worker_processes():
+    with MockServer(n_studies=60) as server:
+        with ClinicalTrialsAPI(parse_workers=2, parse_chunk_size=10) as client:
+            server.configure(client)
+            parallel = client.fetch_trials('x', page_size=30)
+            trimmed = client.fetch_trials('x', page_size=30, max_results=45)
+            _, sites = client.fetch_trials('x', page_size=30, sites=True)
+            assert client._parse_pool._mp_context.get_start_method() == 'spawn'
+        serial = server.configure(ClinicalTrialsAPI()).fetch_trials('x', page_size=30)
+        serial_sites = server.configure(ClinicalTrialsAPI()).fetch_sites('x', page_size=30)
+    assert list(parallel['nct_id']) == list(serial['nct_id'])
+    assert parallel['locations'].isna().equals(serial['locations'].isna())
+    assert list(trimmed['nct_id']) == list(serial['nct_id'][:45])
+    assert sites.equals(serial_sites)
+    # Decoding and flattening were timed in the workers
+    assert parallel.attrs['metrics']['studies'] == 60
+    assert parallel.attrs['metrics']['decode_seconds'] > 0
+
+
+def decode_renaming_sponsors(content):
+    data = json.loads(content)
+    for study in data.get('studies', []):
+        study['protocolSection']['sponsorCollaboratorsModule']['leadSponsor']['name'] = 'Decoded'
+    return data
+
+
+def test_parse_workers_use_the_client_json_decoder():
+    with MockServer(n_studies=20) as server:
+        with ClinicalTrialsAPI(parse_workers=2, parse_chunk_size=5,
+                               json_decoder=decode_renaming_sponsors) as client:
+            server.configure(client)
+            trials = client.fetch_trials('x', page_size=10)
+    assert set(trials['sponsor']) == {'Decoded'}
+    
+    with pytest.raises(ValueError):
+        ClinicalTrialsAPI(parse_workers=2, json_decoder=lambda content: json.loads(content))
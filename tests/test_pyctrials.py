@@ -0,0 +1,177 @@
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from pyctrials import ClinicalTrialParser, ClinicalTrialsAPI
+from pyctrials.pyctrials import (
+    MAX_PAGE_BYTES, MAX_PAGE_SIZE, MIN_PAGE_SIZE, _Pager, _TrialAccumulator, _prefetch
+)
+from tests.helpers import MockServer, make_pages, make_study
+
+
+def test_accumulator_deduplicates_on_nct_id():
+    client = ClinicalTrialsAPI()
+    accumulator = _TrialAccumulator()
+    for page in make_pages(25, 10):
+        accumulator.add(client._flatten_response(json.dumps(page)))
+    # A study repeated on a later page is kept only once
+    accumulator.add([ClinicalTrialParser.flatten_trial(make_study(3))])
+    
+    df = accumulator.to_frame()
+    assert len(df) == 25
+    assert df['nct_id'].is_unique
+    assert pd.api.types.is_datetime64_any_dtype(df['completion_date'])
+
+
+def test_accumulator_matches_merge_path():
+    client = ClinicalTrialsAPI()
+    pages = [json.dumps(page) for page in make_pages(30, 10)]
+    
+    merged = client._process_response(pages[0])
+    accumulator = _TrialAccumulator()
+    accumulator.add(client._flatten_response(pages[0]))
+    for text in pages[1:]:
+        merged = client._merge_trials(merged, client._process_response(text))
+        accumulator.add(client._flatten_response(text))
+    
+    df = accumulator.to_frame()
+    merged = merged.drop(columns='source')
+    assert sorted(df['nct_id']) == sorted(merged['nct_id'])
+    assert set(df.columns) == set(merged.columns)
+
+
+def test_client_uses_pooled_session():
+    with ClinicalTrialsAPI(pool_maxsize=4, adapter_retries=2) as client:
+        adapter = client.session.get_adapter(client.BASE_URL)
+        assert adapter._pool_maxsize == 4
+        assert adapter.max_retries.total == 2
+
+
+def test_iter_pages_and_trials_stream_from_pagination():
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        pages = list(client.iter_pages('x', page_size=10))
+        trials = list(client.iter_trials('x', page_size=10))
+        df = client.fetch_trials('x', page_size=10)
+    assert [len(page) for page in pages] == [10, 10, 5]
+    assert [t['nct_id'] for t in trials] == list(df['nct_id'])
+    assert len(server.study_requests) == 9
+
+
+def test_each_page_is_decoded_once_from_bytes():
+    calls = []
+    
+    def decoder(payload):
+        calls.append(type(payload))
+        return json.loads(payload)
+    
+    with MockServer(n_studies=25) as server:
+        client = server.configure(ClinicalTrialsAPI(json_decoder=decoder))
+        df = client.fetch_trials('x', page_size=10)
+        version = client.get_version()
+    assert len(df) == 25
+    assert 'dataTimestamp' in version
+    assert calls == [bytes] * 4
+
+
+def test_max_results_stops_pagination_and_trims_last_page():
+    with MockServer(n_studies=100) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        df = client.fetch_trials('x', page_size=10, max_results=25)
+    assert list(df['nct_id']) == [f'NCT{i:08d}' for i in range(25)]
+    # The last request only asks for what is still needed
+    assert [r['pageSize'] for r in server.study_requests] == ['10', '10', '5']
+
+
+def test_auto_page_size_starts_at_maximum_and_backs_off():
+    params = {}
+    pager = _Pager(params, 'auto')
+    assert params['pageSize'] == MAX_PAGE_SIZE
+    pager.advance([{}] * MAX_PAGE_SIZE, 'next', MAX_PAGE_BYTES + 1)
+    assert params['pageSize'] == MAX_PAGE_SIZE // 2
+    assert params['pageToken'] == 'next'
+    for _ in range(20):
+        pager.back_off()
+    assert params['pageSize'] == MIN_PAGE_SIZE
+    
+    fixed = {}
+    _Pager(fixed, 50).back_off()
+    assert fixed['pageSize'] == 50
+
+
+def test_fields_projection_follows_parser_and_registered_fields():
+    client = ClinicalTrialsAPI()
+    client.parser.register_field('allocation', 'protocolSection.designModule.designInfo.allocation')
+    params = client._build_params('x', 'RECRUITING')
+    fields = params['fields'].split(',')
+    assert set(ClinicalTrialParser.FIELDS.values()) < set(fields)
+    assert fields[-1] == 'protocolSection.designModule.designInfo.allocation'
+    assert 'fields' not in client._build_params('x', 'RECRUITING', fields='all')
+    
+    study = make_study(1)
+    study['protocolSection']['designModule']['designInfo'] = {'allocation': 'RANDOMIZED'}
+    assert client.parser.flatten(study)['allocation'] == 'RANDOMIZED'
+    assert client.parser.flatten(make_study(2))['allocation'] is None
+
+
+def test_sharded_fetch_matches_serial_fetch():
+    with MockServer(n_studies=120) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        serial = client.fetch_trials('x', page_size=50)
+        sharded = client.fetch_trials_sharded('x', shard_size=30, max_workers=4, page_size=50)
+        filters = [r.get('filter.advanced', '') for r in server.study_requests]
+    
+    assert sorted(sharded['nct_id']) == sorted(serial['nct_id'])
+    assert sharded['nct_id'].is_unique
+    assert 'AREA[StartDate]MISSING' in filters
+    assert 'AREA[StartDate]RANGE[MIN,MAX]' in filters
+    # Every shard fetch stays below the target shard size
+    fetches = [
+        r for r in server.study_requests
+        if 'filter.advanced' in r and r.get('countTotal') != 'true'
+    ]
+    assert all(len(server.matching(r)) <= 30 for r in fetches)
+
+
+def test_prefetch_overlaps_downloads_with_parsing():
+    with MockServer(n_studies=50, latency=0.05) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        serial = client.fetch_trials('x', page_size=10)
+        
+        start = time.perf_counter()
+        pages = []
+        for page in client.iter_pages('x', page_size=10, prefetch=2):
+            time.sleep(0.05)  # simulate slow processing of each page
+            pages.append(page)
+        pipelined_time = time.perf_counter() - start
+        prefetched = client.fetch_trials('x', page_size=10, prefetch=2)
+    
+    assert prefetched.equals(serial)
+    assert sum(len(page) for page in pages) == 50
+    # Five pages of 50 ms download plus 50 ms processing take about 500 ms
+    # serially; pipelined they take about 300 ms
+    assert pipelined_time < 0.45
+
+
+def test_prefetch_propagates_errors_and_stops_when_abandoned():
+    def failing():
+        yield 1
+        raise ValueError('boom')
+    
+    with pytest.raises(ValueError):
+        list(_prefetch(failing(), 1))
+    
+    produced = []
+    
+    def endless():
+        for i in range(1000):
+            produced.append(i)
+            yield i
+    
+    stream = _prefetch(endless(), 2)
+    assert next(stream) == 0
+    stream.close()
+    time.sleep(0.3)
+    assert len(produced) < 10
@@ -0,0 +1,52 @@
+import multiprocessing
+import threading
+import time
+
+from pyctrials import ClinicalTrialsAPI, FileRateLimiter, RateLimiter
+from tests.helpers import MockServer
+
+
+def test_shared_limiter_caps_aggregate_rate_across_clients():
+    with MockServer(n_studies=30) as server:
+        clients = [server.configure(ClinicalTrialsAPI(rate_limit=20)) for _ in range(3)]
+        assert clients[0].rate_limiter is clients[2].rate_limiter
+        start = time.perf_counter()
+        threads = [
+            threading.Thread(target=client.fetch_trials, args=('x',), kwargs={'page_size': 3})
+            for client in clients
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    # 30 requests at 20/s with a burst of 20
+    assert len(server.study_requests) == 30
+    assert elapsed >= 0.45
+
+
+def test_limiter_bursts_then_paces():
+    limiter = RateLimiter(rate=50, burst=5)
+    waits = [limiter.acquire() for _ in range(10)]
+    assert waits[:5] == [0.0] * 5
+    assert all(wait > 0 for wait in waits[6:])
+
+
+def _acquire_many(path, count):
+    limiter = FileRateLimiter(path, rate=40, burst=1)
+    for _ in range(count):
+        limiter.acquire()
+
+
+def test_file_limiter_coordinates_processes(tmp_path):
+    path = str(tmp_path / 'bucket')
+    context = multiprocessing.get_context('spawn')
+    processes = [context.Process(target=_acquire_many, args=(path, 10)) for _ in range(2)]
+    start = time.perf_counter()
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+    # 20 requests at 40/s across both processes
+    assert time.perf_counter() - start >= 0.45
+    assert all(process.exitcode == 0 for process in processes)
@@ -0,0 +1,95 @@
+import time
+
+import pytest
+import requests
+from requests.exceptions import (
+    ChunkedEncodingError, ConnectionError, HTTPError, InvalidURL, MissingSchema,
+    TooManyRedirects
+)
+
+from pyctrials import ClinicalTrialsAPI, RetryPolicy
+from pyctrials.retry import RetryBudgetExceeded
+from tests.helpers import MockServer
+
+
+def test_client_errors_are_not_retried():
+    with MockServer(n_studies=5) as server:
+        server.failures, server.failure_status = 3, 404
+        client = server.configure(ClinicalTrialsAPI(retry_delay=0))
+        with pytest.raises(HTTPError):
+            client.fetch_trials('x')
+    assert len(server.study_requests) == 1
+    assert client.retry_policy.stats['not_retryable'] == 1
+
+
+def test_only_transient_errors_are_retried():
+    policy = RetryPolicy()
+    for error in [InvalidURL('x'), MissingSchema('x'), TooManyRedirects('x')]:
+        assert not policy.is_retryable(error)
+    for error in [ConnectionError('x'), ChunkedEncodingError('x'), requests.Timeout('x')]:
+        assert policy.is_retryable(error)
+
+
+def test_retry_after_is_honored_up_to_its_own_cap():
+    with MockServer(n_studies=5) as server:
+        server.failures, server.failure_status, server.retry_after = 1, 429, '0.2'
+        client = server.configure(ClinicalTrialsAPI(retry_policy=RetryPolicy(base_delay=30)))
+        start = time.perf_counter()
+        trials = client.fetch_trials('x')
+        elapsed = time.perf_counter() - start
+    assert len(trials) == 5
+    assert 0.2 <= elapsed < 5
+    
+    response = requests.Response()
+    response.status_code, response.headers['Retry-After'] = 503, '120'
+    error = HTTPError(response=response)
+    assert RetryPolicy(max_delay=1).delay(0, error) == 120
+    
+    # A wait beyond max_retry_after fails the request instead of retrying early
+    policy = RetryPolicy(max_retry_after=60)
+    calls = []
+    
+    def throttled():
+        calls.append(1)
+        raise error
+    
+    with pytest.raises(HTTPError):
+        policy.call(throttled)
+    assert len(calls) == 1
+    assert policy.counts()['retry_after_exceeded'] == 1
+
+
+def test_backoff_grows_exponentially_with_jitter_up_to_the_cap():
+    policy = RetryPolicy(base_delay=1, max_delay=5, jitter=False)
+    assert [policy.delay(attempt) for attempt in range(5)] == [1, 2, 4, 5, 5]
+    jittered = RetryPolicy(base_delay=1, max_delay=5)
+    assert all(0 <= jittered.delay(3) <= 5 for _ in range(100))
+
+
+def test_retry_budget_limits_retries_across_requests():
+    policy = RetryPolicy(base_delay=0, budget_ratio=0, min_retries=2)
+    calls = []
+    
+    def failing():
+        calls.append(1)
+        raise ConnectionError('down')
+    
+    with pytest.raises(RetryBudgetExceeded):
+        policy.call(failing)
+    assert len(calls) == 3
+    with pytest.raises(RetryBudgetExceeded):
+        policy.call(failing)
+    assert len(calls) == 4
+    assert policy.stats['budget_exhausted'] == 2
+
+
+def test_one_policy_is_shared_by_every_endpoint():
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI(retry_delay=0))
+        server.failures = 1
+        assert client.count_trials('x') == 5
+        server.failures = 1
+        assert len(client.fetch_trials('x')) == 5
+        client.get_version()
+    assert client.retry_policy.stats['retries'] == 2
+    assert client.retry_policy.stats['requests'] == 3
@@ -0,0 +1,100 @@
+from unittest import mock
+
+import pandas as pd
+import pytest
+from requests.exceptions import RequestException
+
+from pyctrials import ClinicalTrialsAPI, TrialStore
+from tests.helpers import MockServer
+
+
+def test_sync_fetches_only_updated_studies(tmp_path):
+    with MockServer(n_studies=30) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        with mock.patch('pyctrials.pyctrials.datetime') as clock:
+            clock.now.return_value.date.return_value.isoformat.return_value = '2024-03-01'
+            first = client.sync('x', str(tmp_path))
+        assert len(first) == 30
+        assert 'filter.advanced' not in server.study_requests[-1]
+        
+        server.updated = {3: '2024-03-05', 7: '2024-03-01'}
+        server.n_studies = 32
+        server.updated.update({30: '2024-03-02', 31: '2024-03-02'})
+        second = client.sync('x', TrialStore(str(tmp_path)))
+        request = server.study_requests[-1]
+    
+    assert request['filter.advanced'] == 'AREA[LastUpdatePostDate]RANGE[2024-03-01,MAX]'
+    assert len(second) == 32
+    assert second['nct_id'].is_unique
+    titles = second.set_index('nct_id')['brief_title']
+    assert titles['NCT00000003'].endswith('(updated)')
+    assert titles['NCT00000007'].endswith('(updated)')
+    assert not titles['NCT00000004'].endswith('(updated)')
+    assert TrialStore(str(tmp_path)).load().equals(second)
+
+
+def test_sync_keeps_compact_dtypes(tmp_path):
+    with MockServer(n_studies=30) as server:
+        client = server.configure(ClinicalTrialsAPI(compact=True))
+        with mock.patch('pyctrials.pyctrials.datetime') as clock:
+            clock.now.return_value.date.return_value.isoformat.return_value = '2024-03-01'
+            first = client.sync('x', str(tmp_path))
+        # The updated studies only cover some sponsors and statuses
+        server.updated = {3: '2024-03-05', 7: '2024-03-05'}
+        second = client.sync('x', str(tmp_path))
+    
+    assert len(second) == 30
+    categorical = [c for c in first.columns if isinstance(first[c].dtype, pd.CategoricalDtype)]
+    assert 'sponsor' in categorical
+    assert all(isinstance(second[c].dtype, pd.CategoricalDtype) for c in categorical)
+    assert str(second['enrollment_count'].dtype) == 'Int32'
+    sponsors = second.set_index('nct_id')['sponsor']
+    assert sponsors['NCT00000003'] == 'Sponsor 3'
+    assert sponsors['NCT00000010'] == 'Sponsor 10'
+
+
+def test_sync_restarts_when_query_changes(tmp_path):
+    store = TrialStore(str(tmp_path))
+    with MockServer(n_studies=5) as server:
+        client = server.configure(ClinicalTrialsAPI())
+        client.sync('x', store)
+        client.sync({'condition': 'y', 'status': 'COMPLETED'}, store)
+    assert 'filter.advanced' not in server.study_requests[-1]
+    assert store.state()['query'] == '{"condition": "y", "status": "COMPLETED"}'
+
+
+def test_interrupted_fetch_resumes_from_checkpoint(tmp_path):
+    with MockServer(n_studies=50) as server:
+        client = server.configure(ClinicalTrialsAPI(max_retries=1))
+        original = client._get
+        calls = []
+        
+        def flaky_get(url, params=None, use_cache=True, **kwargs):
+            calls.append(params.get('pageToken'))
+            if len(calls) == 4:
+                raise RequestException('connection lost')
+            return original(url, params, use_cache, **kwargs)
+        
+        client._get = flaky_get
+        with pytest.raises(RequestException):
+            client.fetch_trials('x', page_size=10, checkpoint_dir=str(tmp_path))
+        
+        client._get = original
+        trials = client.fetch_trials('x', page_size=10, checkpoint_dir=str(tmp_path))
+        resumed = [r.get('pageToken') for r in server.study_requests[3:]]
+    
+    assert list(trials['nct_id']) == [f'NCT{i:08d}' for i in range(50)]
+    assert resumed == ['30', '40']
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_checkpoint_key_depends_on_parser_configuration():
+    def key(client):
+        return client._make_pager('x', 'RECRUITING', 10, None, None, None).query_key
+    
+    default = ClinicalTrialsAPI()
+    lists = ClinicalTrialsAPI(list_columns=True)
+    extra = ClinicalTrialsAPI()
+    extra.parser.register_field('why_stopped', 'protocolSection.statusModule.whyStopped')
+    assert key(default) == key(ClinicalTrialsAPI())
+    assert len({key(default), key(lists), key(extra)}) == 3